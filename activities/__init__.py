@@ -0,0 +1,208 @@
+"""Registry of break activities and their lazily imported widgets.
+
+An activity is described by an ActivitySpec: its metadata is all the
+engine needs to pick one, and the module building its widget is only
+imported the first time the activity is shown. Nothing here imports PyQt6.
+
+Besides the built-in activities, specs are discovered from:
+
+- the `active_breaks.activities` entry point group, whose entries load an
+  ActivitySpec or a list of them (point them at a small module, not at the
+  widget code)
+- JSON manifests in PLUGINS_DIR, each holding one spec or a list of specs
+  with the ActivitySpec fields; the directory is put on `sys.path` so
+  their `widget` modules can live next to them
+
+A widget module may also define `cached_bytes()` and `release_caches()`
+for caches its widgets share, so they can be measured and dropped between
+breaks.
+"""
+import importlib
+import json
+import logging
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import fields
+from pathlib import Path
+
+ENTRY_POINT_GROUP = "active_breaks.activities"
+PLUGINS_DIR = Path.home() / ".local" / "share" / "active_breaks" / "activities"
+
+
+@dataclass(frozen=True)
+class ActivitySpec:
+    """Metadata of a break activity.
+
+    `widget` is a "module:callable" reference to a function that takes the
+    break window and returns the widget to show, or None for a text-only
+    activity. `duration` overrides the break duration, in seconds.
+    """
+
+    name: str
+    weight: float = 1.0
+    duration: float = None
+    needs_blocker: bool = True
+    widget: str = None
+
+    def __post_init__(self):
+        def is_number(value) -> bool:
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+        if not isinstance(self.name, str) or not self.name:
+            raise ValueError(f"Activity name must be a string: {self.name!r}")
+        if not is_number(self.weight) or not self.weight > 0:
+            raise ValueError(f"Weight of {self.name} must be positive: {self.weight!r}")
+        if self.duration is not None and not (
+            is_number(self.duration) and self.duration > 0
+        ):
+            raise ValueError(f"Duration of {self.name} must be positive or null")
+        if not isinstance(self.needs_blocker, bool):
+            raise ValueError(f"needs_blocker of {self.name} must be true or false")
+        if self.widget is not None and not isinstance(self.widget, str):
+            raise ValueError(f"Widget of {self.name} must be a module:callable string")
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "ActivitySpec":
+        """Build a spec from a manifest entry, ValueError if it is invalid."""
+        if not isinstance(values, dict):
+            raise ValueError(f"Activity must be an object: {values!r}")
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in values.items() if key in names})
+
+
+BUILTIN_ACTIVITIES = [
+    ActivitySpec("Take a short walk"),
+    ActivitySpec(
+        "Do some deep breathing exercises",
+        widget="activities.breathing:create_widget",
+    ),
+    ActivitySpec("Perform desk exercises", widget="activities.exercises:create_widget"),
+    ActivitySpec("Get a glass of water", widget="activities.hydration:create_widget"),
+    ActivitySpec("Look at something 20 feet away for 20 seconds"),
+]
+
+
+class ActivityRegistry:
+    """Activity specs by name, with widget factories imported on first use."""
+
+    def __init__(self, specs: list[ActivitySpec] = None):
+        self._specs: dict[str, ActivitySpec] = {}
+        self._factories: dict[str, Callable] = {}
+        for spec in BUILTIN_ACTIVITIES if specs is None else specs:
+            self.register(spec)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def register(self, spec: ActivitySpec):
+        """Add an activity, replacing any registered under the same name."""
+        self._specs[spec.name] = spec
+        self._factories.pop(spec.name, None)
+
+    def get(self, name: str) -> ActivitySpec | None:
+        return self._specs.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def weights(self) -> dict[str, float]:
+        return {name: spec.weight for name, spec in self._specs.items()}
+
+    def durations(self) -> dict[str, float]:
+        return {
+            name: spec.duration
+            for name, spec in self._specs.items()
+            if spec.duration is not None
+        }
+
+    def needs_blocker(self, name: str) -> bool:
+        spec = self._specs.get(name)
+        return spec is None or spec.needs_blocker
+
+    def widget_factory(self, name: str) -> Callable | None:
+        """Import and return the widget factory of an activity, if it has one."""
+        factory = self._factories.get(name)
+        if factory is not None:
+            return factory
+        spec = self._specs.get(name)
+        if spec is None or spec.widget is None:
+            return None
+
+        module_name, _, attribute = spec.widget.partition(":")
+        try:
+            module = importlib.import_module(module_name)
+            factory = getattr(module, attribute or "create_widget")
+        except (ImportError, AttributeError):
+            logging.exception("Unable to load the widget of activity %s", name)
+            return None
+        logging.debug("Loaded widget module %s for activity %s", module_name, name)
+        self._factories[name] = factory
+        return factory
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._factories
+
+    def _loaded_modules(self):
+        modules = {sys.modules.get(f.__module__) for f in self._factories.values()}
+        return [module for module in modules if module is not None]
+
+    def cached_bytes(self) -> int:
+        """Size of the caches shared by the widgets of loaded activities."""
+        return sum(
+            module.cached_bytes()
+            for module in self._loaded_modules()
+            if hasattr(module, "cached_bytes")
+        )
+
+    def release_caches(self):
+        """Drop the caches of loaded widget modules; they refill on next use."""
+        for module in self._loaded_modules():
+            if hasattr(module, "release_caches"):
+                module.release_caches()
+
+    def discover(self, plugins_dir: Path = PLUGINS_DIR, entry_points: bool = True):
+        """Register activities from the plugins directory and entry points."""
+        for spec in self._manifest_specs(Path(plugins_dir)):
+            self.register(spec)
+        if entry_points:
+            for spec in self._entry_point_specs():
+                self.register(spec)
+
+    @staticmethod
+    def _manifest_specs(plugins_dir: Path) -> list[ActivitySpec]:
+        try:
+            manifests = sorted(plugins_dir.glob("*.json"))
+        except OSError:
+            return []
+        specs = []
+        for manifest in manifests:
+            try:
+                data = json.loads(manifest.read_text())
+            except (OSError, ValueError):
+                logging.exception("Skipping invalid activity manifest %s", manifest)
+                continue
+            for entry in data if isinstance(data, list) else [data]:
+                try:
+                    specs.append(ActivitySpec.from_dict(entry))
+                except (ValueError, TypeError) as e:
+                    logging.warning("Skipping activity in %s: %s", manifest, e)
+        if specs and str(plugins_dir) not in sys.path:
+            sys.path.append(str(plugins_dir))
+        return specs
+
+    @staticmethod
+    def _entry_point_specs() -> list[ActivitySpec]:
+        # importlib.metadata is slow to import, so only pay for it here
+        from importlib.metadata import entry_points
+
+        specs = []
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                loaded = entry_point.load()
+            except Exception:
+                logging.exception("Unable to load activity plugin %s", entry_point)
+                continue
+            entries = loaded if isinstance(loaded, (list, tuple)) else [loaded]
+            specs.extend(entry for entry in entries if isinstance(entry, ActivitySpec))
+        return specs
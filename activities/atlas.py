@@ -0,0 +1,111 @@
+"""Sprite atlas: every exercise frame at several scales in one mapped file.
+
+The atlas is built by scripts/build_atlas.py. It starts with MAGIC and the
+length of a JSON index, followed by the index and the frames' pixels as
+premultiplied ARGB32 rows, each either raw or zlib-compressed:
+
+    {"frames": [{"name": "exercise-1", "variants": [
+        {"scale": 1, "width": 200, "height": 200, "offset": 4096,
+         "length": 160000, "codec": "raw"}, ...]}, ...]}
+
+The file is opened once and memory-mapped, so a frame costs no file open
+and no image decoding: raw frames are wrapped in place, compressed ones
+only need inflating.
+"""
+import ctypes
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+
+from PyQt6 import sip
+from PyQt6.QtGui import QImage
+
+MAGIC = b"ABATLAS1"
+HEADER = struct.Struct("<8sI")
+# Frame data offsets are aligned for QImage, which needs 32-bit aligned rows
+ALIGNMENT = 16
+IMAGE_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+class SpriteAtlas:
+    """Read-only view of an atlas file, handing out frames as QImages."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+            # A private mapping: pages are shared until written, which never
+            # happens, and raw frames can be wrapped without copying
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, index_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sprite atlas")
+        index = json.loads(self._map[HEADER.size : HEADER.size + index_length])
+        self._frames = {
+            frame["name"]: sorted(frame["variants"], key=lambda v: v["scale"])
+            for frame in index["frames"]
+        }
+        self._address = ctypes.addressof(ctypes.c_char.from_buffer(self._map))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._frames
+
+    def names(self) -> list[str]:
+        return list(self._frames)
+
+    def scales(self, name: str) -> list[float]:
+        return [variant["scale"] for variant in self._frames[name]]
+
+    def variant(self, name: str, dpr: float) -> dict:
+        """The smallest variant at least `dpr` times the base size, or the largest."""
+        variants = self._frames[name]
+        for variant in variants:
+            if variant["scale"] >= dpr:
+                return variant
+        return variants[-1]
+
+    def version(self, name: str) -> int:
+        return self.mtime
+
+    def image(self, name: str, dpr: float = 1.0, width: int = None) -> QImage:
+        """The frame `name` for a screen with device pixel ratio `dpr`.
+
+        `width` is only a hint, frames come at their packed sizes.
+        """
+        variant = self.variant(name, dpr)
+        width, height = variant["width"], variant["height"]
+        offset, length = variant["offset"], variant["length"]
+        if variant["codec"] == "raw":
+            # Points into the mapping, which lives as long as the atlas
+            image = QImage(
+                sip.voidptr(self._address + offset),
+                width,
+                height,
+                width * 4,
+                IMAGE_FORMAT,
+            )
+        else:
+            pixels = zlib.decompress(self._map[offset : offset + length])
+            image = QImage(pixels, width, height, width * 4, IMAGE_FORMAT).copy()
+        image.setDevicePixelRatio(variant["scale"])
+        return image
+
+
+_atlases: dict[str, SpriteAtlas | None] = {}
+
+
+def load_atlas(path: str) -> SpriteAtlas | None:
+    """Open the atlas at `path` once per process, None if it is missing or invalid."""
+    if path not in _atlases:
+        try:
+            _atlases[path] = SpriteAtlas(path)
+            logging.debug("Loaded sprite atlas %s", path)
+        except FileNotFoundError:
+            _atlases[path] = None
+        except (OSError, ValueError, KeyError, struct.error):
+            logging.exception("Unable to load sprite atlas %s", path)
+            _atlases[path] = None
+    return _atlases[path]
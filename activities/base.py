@@ -0,0 +1,45 @@
+"""Helpers shared by the activity widgets."""
+import os
+import sys
+
+
+def get_resource_path(relative_path):
+    """Get the path to a resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+class VisibilityLifecycleMixin:
+    """Runs a widget's animations and timers only while it is visible on screen.
+
+    Subclasses override `start_animations` and `stop_animations`; they are
+    called from the show and hide events, which Qt also delivers when the
+    parent window is shown, hidden or minimized. The mixin is combined with
+    QWidget, whose metaclass rules out abc, so the hooks default to doing
+    nothing.
+    """
+
+    _animations_running = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._animations_running:
+            self._animations_running = True
+            self.start_animations()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self._animations_running:
+            self._animations_running = False
+            self.stop_animations()
+
+    def start_animations(self):
+        """Start the widget's animations and timers, it has become visible."""
+
+    def stop_animations(self):
+        """Stop everything `start_animations` started, it is hidden now."""
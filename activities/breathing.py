@@ -0,0 +1,243 @@
+"""Breathing exercise: a circle that grows and shrinks with each breath."""
+import math
+import time
+from enum import Enum
+
+from PyQt6.QtCore import pyqtProperty
+from PyQt6.QtCore import QEasingCurve
+from PyQt6.QtCore import QPropertyAnimation
+from PyQt6.QtCore import QRect
+from PyQt6.QtCore import QRectF
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QPainter
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtWidgets import QVBoxLayout
+from PyQt6.QtWidgets import QWidget
+
+from activities.base import VisibilityLifecycleMixin
+
+
+def cached_bytes() -> int:
+    return sum(
+        sprite.width() * sprite.height() * 4
+        for sprite in BreathingWidget._sprites.values()
+    )
+
+
+def release_caches():
+    BreathingWidget._sprites.clear()
+
+
+class BreathState(Enum):
+    INHALE = "Inhale"
+    EXHALE = "Exhale"
+    HOLD = "Hold"
+
+
+class BreathingWidget(VisibilityLifecycleMixin, QWidget):
+    """Breathing guide: a circle that grows on inhale and shrinks on exhale.
+
+    Size changes from the animation are coalesced into at most `max_fps`
+    repaints a second (`LOW_POWER_FPS` in low-power mode), each limited to
+    the circle's bounding rectangle, and the circle is drawn from a sprite
+    rendered once.
+    """
+
+    LOW_POWER_FPS = 10
+
+    # Pre-rendered circles by (size, color, device pixel ratio)
+    _sprites: dict[tuple, QPixmap] = {}
+
+    def __init__(self, parent=None, **kwargs):
+        super().__init__(parent)
+        self._breathe_progress = 0
+
+        # Default values
+        self.min_size = kwargs.get("min_size", 10)
+        self.max_size = kwargs.get("max_size", 200)
+        self.hold_time = kwargs.get("hold_time", 5000)
+        self.breath_time = kwargs.get("breath_time", 7000)
+        self.circle_color = kwargs.get("circle_color", QColor(200, 200, 255))
+        self.text_color = kwargs.get("text_color", QColor(0, 0, 0))
+        self.max_fps = kwargs.get("max_fps", 30)
+        self.low_power = kwargs.get("low_power", False)
+
+        self._dot_size = self.min_size
+        # Size of the circle as last invalidated, and when that happened
+        self._shown_size = self.min_size
+        self._last_frame = 0.0
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.flush_frame)
+        self.state = BreathState.INHALE
+
+        self.setMinimumSize(self.max_size, self.max_size)
+
+        self.label = QLabel(self.state.value, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.label.setStyleSheet(f"color: {self.text_color.name()}")
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.label)
+        self.setLayout(layout)
+
+        self.animation = QPropertyAnimation(self, b"dot_size")
+        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+        self.animation.setDuration(self.breath_time)
+        self.animation.finished.connect(self.on_animation_finished)
+
+        # Pause between inhale and exhale, kept so it can be cancelled on hide
+        self.hold_timer = QTimer(self)
+        self.hold_timer.setSingleShot(True)
+        self.hold_timer.timeout.connect(self.on_hold_finished)
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setStyleSheet("background:transparent;")
+
+    def start_inhale(self):
+        self.state = BreathState.INHALE
+        self.label.setText(self.state.value)
+        self.animation.setDuration(self.breath_time)
+        self.animation.setStartValue(self.min_size)
+        self.animation.setEndValue(self.max_size)
+        self.animation.start()
+
+    def start_exhale(self):
+        self.state = BreathState.EXHALE
+        self.label.setText(self.state.value)
+        self.animation.setDuration(self.breath_time)
+        self.animation.setStartValue(self.max_size)
+        self.animation.setEndValue(self.min_size)
+        self.animation.start()
+
+    def start(self):
+        """Start the breathing animation from a fresh inhale."""
+        self.hold_timer.stop()
+        self.start_inhale()
+
+    def stop(self):
+        """Stop the breathing animation and any pending hold."""
+        self.animation.stop()
+        self.hold_timer.stop()
+        self.frame_timer.stop()
+        self._dot_size = self._shown_size = self.min_size
+        self.breathe_progress = 0
+
+    def start_animations(self):
+        self.start()
+
+    def stop_animations(self):
+        self.stop()
+
+    def set_timing(self, hold_time: int, breath_time: int):
+        """Change the hold and breath durations, from the next breath on."""
+        self.hold_time = hold_time
+        self.breath_time = breath_time
+        if self.animation.state() != QPropertyAnimation.State.Running:
+            self.animation.setDuration(breath_time)
+
+    def set_frame_rate(self, max_fps: int, low_power: bool = False):
+        """Cap repaints at `max_fps`, or `LOW_POWER_FPS` in low-power mode."""
+        self.max_fps = max_fps
+        self.low_power = low_power
+
+    def frame_interval(self) -> float:
+        fps = self.LOW_POWER_FPS if self.low_power else self.max_fps
+        return 1 / fps if fps > 0 else 0.0
+
+    def on_animation_finished(self):
+        self.state = BreathState.HOLD
+        self.label.setText(self.state.value)
+        self.hold_timer.start(self.hold_time)
+
+    def on_hold_finished(self):
+        if self._dot_size == self.max_size:
+            self.start_exhale()
+        else:
+            self.start_inhale()
+
+    def dot_rect(self, size: int) -> QRect:
+        """Rectangle covered by the circle at `size`, with room for antialiasing."""
+        radius = size // 2
+        center = self.rect().center()
+        extent = 2 * radius + 3
+        return QRect(center.x() - radius - 1, center.y() - radius - 1, extent, extent)
+
+    def sprite(self) -> QPixmap:
+        """The circle at full size, rendered once and scaled down when drawn."""
+        dpr = self.devicePixelRatioF()
+        key = (self.max_size, self.circle_color.rgba(), dpr)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            size = round(self.max_size * dpr)
+            sprite = QPixmap(size, size)
+            sprite.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(sprite)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.circle_color)
+            painter.drawEllipse(0, 0, size, size)
+            painter.end()
+            self._sprites[key] = sprite
+        return sprite
+
+    def flush_frame(self):
+        """Invalidate the area between the shown and the current circle."""
+        self._last_frame = time.monotonic()
+        # The circles are concentric, so the larger one covers both
+        self.update(self.dot_rect(max(self._dot_size, self._shown_size)))
+        self._shown_size = self._dot_size
+
+    def paintEvent(self, event):
+        radius = self._dot_size // 2
+        if radius <= 0:
+            return
+        painter = QPainter(self)
+        if not self.low_power:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        center = self.rect().center()
+        sprite = self.sprite()
+        painter.drawPixmap(
+            QRectF(center.x() - radius, center.y() - radius, 2 * radius, 2 * radius),
+            sprite,
+            QRectF(sprite.rect()),
+        )
+
+    def get_dot_size(self):
+        return self._dot_size
+
+    def set_dot_size(self, size):
+        if self._dot_size == size:
+            return
+        self._dot_size = size
+        if self.frame_timer.isActive():
+            return  # The pending frame will pick up the new size
+
+        wait = self._last_frame + self.frame_interval() - time.monotonic()
+        if wait <= 0:
+            self.flush_frame()
+        else:
+            self.frame_timer.start(math.ceil(wait * 1000))
+
+    @pyqtProperty(float)
+    def breathe_progress(self):
+        return self._breathe_progress
+
+    @breathe_progress.setter
+    def breathe_progress(self, value):
+        self._breathe_progress = value
+        self.update()  # Trigger a repaint when the progress changes
+
+    dot_size = pyqtProperty(int, get_dot_size, set_dot_size)
+
+
+def create_widget(window) -> BreathingWidget:
+    return BreathingWidget(
+        window,
+        hold_time=window.hold_duration,
+        breath_time=window.breath_duration,
+        max_fps=window.breathing_fps,
+        low_power=window.low_power,
+    )
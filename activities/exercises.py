@@ -0,0 +1,591 @@
+"""Desk exercises: a slideshow of exercise sketches decoded in the background.
+
+Images come from the user's exercise library when it has any, see
+activities.library, otherwise from the sprite atlas built by
+scripts/build_atlas.py, with 1x, 2x and 3x variants for HiDPI screens, or
+from the PNG files when no atlas has been built.
+
+Animated GIF, APNG and WebP files are played by an AnimationPlayer, which
+streams their frames from the decoder thread and shows each item for as
+long as the animation itself lasts.
+"""
+import logging
+import os
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import QEvent
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QImage
+from PyQt6.QtGui import QImageReader
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtWidgets import QVBoxLayout
+from PyQt6.QtWidgets import QWidget
+
+from activities.atlas import load_atlas
+from activities.base import get_resource_path
+from activities.base import VisibilityLifecycleMixin
+from activities.library import ExerciseLibrary
+from activities.library import LIBRARY_DIR
+from activities.library import LibraryWatcher
+
+EXERCISE_IMAGES = [
+    "exercises/exercise-1.png",
+    "exercises/exercise-2.png",
+    "exercises/exercise-3.png",
+    "exercises/exercise-4.png",
+    "exercises/exercise-5.png",
+    "exercises/exercise-6.png",
+    "exercises/exercise-7.png",
+    "exercises/exercise-8.png",
+    "exercises/exercise-9.png",
+    "exercises/exercise-10.png",
+    "exercises/exercise-11.png",
+    "exercises/exercise-12.png",
+]
+ATLAS_PATH = "exercises/exercises.atlas"
+
+
+class _ImageDecodeSignals(QObject):
+    # The last argument is whether the image is animated, None if unchanged
+    decoded = pyqtSignal(object, object, QImage, object)
+
+
+def _is_animated(path: str) -> bool:
+    reader = QImageReader(path)
+    return reader.supportsAnimation() and reader.imageCount() != 1
+
+
+def _fit_width(image: QImage, width: int | None, dpr: float) -> QImage:
+    """Scale `image` down to `width` logical pixels, never up."""
+    target = None if width is None else round(width * dpr)
+    if not image.isNull() and target is not None and image.width() > target:
+        image = image.scaledToWidth(target, Qt.TransformationMode.SmoothTransformation)
+        image.setDevicePixelRatio(dpr)
+    return image
+
+
+def _decode_image(
+    request: tuple,
+    known_key: tuple,
+    signals: _ImageDecodeSignals,
+    source=None,
+):
+    """Decode and scale a single image, runs on the image decoder thread.
+
+    With a `source`, a sprite atlas or exercise library, `path` names one of
+    its images and the source decodes it.
+    """
+    path, width, dpr = request
+    if source is not None:
+        mtime = source.version(path)
+    else:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+    key = (path, mtime, width, dpr)
+    animated = None
+    if key == known_key:
+        # Unchanged on disk, the cached pixmap is still current
+        image = QImage()
+    else:
+        if source is not None:
+            image = source.image(path, dpr, width)
+        else:
+            reader = QImageReader(path)
+            reader.setAutoTransform(True)
+            image = reader.read()
+            if image.isNull():
+                logging.warning(
+                    "Unable to decode image %s: %s", path, reader.errorString()
+                )
+        image = _fit_width(image, width, dpr)
+        # Atlas frames are never animated, library items are files on disk
+        animated = source is None or os.path.isabs(path)
+        animated = animated and _is_animated(path)
+
+    try:
+        signals.decoded.emit(request, key, image, animated)
+    except RuntimeError:
+        # The cache was deleted while the image was being decoded
+        pass
+
+
+_image_decoder = None
+
+
+def image_decoder() -> ThreadPoolExecutor:
+    """Return the single background thread shared by all image decoding."""
+    global _image_decoder
+    if _image_decoder is None:
+        # A plain Python thread rather than a QThreadPool: destroying a pool
+        # waits for its tasks while holding the GIL the tasks need
+        _image_decoder = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="image-decoder"
+        )
+    return _image_decoder
+
+
+class SlideshowImageCache(QObject):
+    """Decodes slideshow images ahead of time into a bounded LRU cache of pixmaps.
+
+    Decoding and file access happen on a worker thread; the GUI thread only
+    converts finished images into pixmaps. Entries are keyed by path, mtime
+    and target width, so a changed file is picked up on its next prefetch.
+    """
+
+    image_ready = pyqtSignal(object)
+
+    def __init__(self, max_entries: int = 16, source=None, parent=None):
+        super().__init__(parent)
+        self.max_entries = max_entries
+        self.source = source
+        self._pixmaps: OrderedDict[tuple, QPixmap] = OrderedDict()
+        self._latest_keys: dict[tuple, tuple] = {}
+        self._pending: set[tuple] = set()
+        self._animated: set[str] = set()
+
+        self._signals = _ImageDecodeSignals(self)
+        self._signals.decoded.connect(self._on_decoded)
+
+    def get(self, path: str, width: int | None, dpr: float):
+        """Return the cached pixmap for a request, or None if it is not ready."""
+        key = self._latest_keys.get((path, width, dpr))
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def prefetch(self, path: str, width: int | None, dpr: float):
+        """Queue a request to be (re)decoded in the background."""
+        request = (path, width, dpr)
+        if request in self._pending:
+            return
+        self._submit(request, self._latest_keys.get(request))
+
+    def _submit(self, request: tuple, known_key: tuple | None):
+        self._pending.add(request)
+        image_decoder().submit(
+            _decode_image, request, known_key, self._signals, self.source
+        )
+
+    def is_animated(self, path: str) -> bool:
+        """Whether the decoded image at `path` has more than one frame."""
+        return path in self._animated
+
+    def _on_decoded(self, request: tuple, key: tuple, image: QImage, animated):
+        self._pending.discard(request)
+        if animated:
+            self._animated.add(request[0])
+        elif animated is not None:
+            self._animated.discard(request[0])
+        old_key = self._latest_keys.get(request)
+        if key == old_key and key in self._pixmaps:
+            return
+        if image.isNull():
+            # A null pixmap would be taken as current by every later prefetch
+            if old_key is not None:
+                self._pixmaps.pop(old_key, None)
+            self._latest_keys.pop(request, None)
+            if animated is None:
+                # Skipped as unchanged, but evicted before the worker got to it
+                self._submit(request, None)
+            return
+        if old_key is not None and old_key != key:
+            self._pixmaps.pop(old_key, None)
+
+        self._latest_keys[request] = key
+        self._pixmaps[key] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.max_entries:
+            evicted, _ = self._pixmaps.popitem(last=False)
+            for cached_request, cached_key in list(self._latest_keys.items()):
+                if cached_key == evicted:
+                    del self._latest_keys[cached_request]
+        self.image_ready.emit(request)
+
+
+class _AnimationStream:
+    """One animation's frames, read on the image decoder thread.
+
+    The reader is opened for each pass through the animation and dropped
+    at its end or once the stream is cancelled.
+    """
+
+    def __init__(self, path: str, width: int | None, dpr: float):
+        self.path = path
+        self.width = width
+        self.dpr = dpr
+        self.cancelled = False
+        self._reader = None
+
+    def read(self, count: int, signals: "_AnimationSignals"):
+        if self.cancelled:
+            self._reader = None
+            return
+        if self._reader is None:
+            self._reader = QImageReader(self.path)
+        reader = self._reader
+
+        frames, ended, failed = [], False, False
+        while len(frames) < count:
+            if not reader.canRead():
+                ended = True
+                break
+            image = reader.read()
+            if image.isNull():
+                logging.warning(
+                    "Unable to decode %s: %s", self.path, reader.errorString()
+                )
+                ended = failed = True
+                break
+            image = _fit_width(image, self.width, self.dpr)
+            frames.append((image, reader.nextImageDelay()))
+        loop_count = reader.loopCount()
+        if ended:
+            self._reader = None
+        try:
+            signals.decoded.emit(self, frames, ended, failed, loop_count)
+        except RuntimeError:
+            pass  # The player was deleted while the frames were being decoded
+
+
+class _AnimationSignals(QObject):
+    decoded = pyqtSignal(object, object, bool, bool, int)
+
+
+class AnimationPlayer(QObject):
+    """Plays an animated image a few frames at a time.
+
+    Frames are decoded on the image decoder thread, at most `buffer_frames`
+    ahead of the one on screen. Animations whose frames fit in `cache_bytes`
+    are kept after their first pass and replayed without decoding again;
+    longer ones are decoded afresh on every pass. An animation that loops
+    forever is played for whole passes until `min_duration_ms` has passed,
+    one with a loop count for exactly that many passes. A frame that fails
+    to decode, or a pass without any frames, stops it with `failed` instead.
+    """
+
+    frame_ready = pyqtSignal(QPixmap)
+    finished = pyqtSignal()
+    failed = pyqtSignal()
+
+    # Delays this short in GIFs mean "as fast as possible", which browsers
+    # and QMovie play at 10 frames a second
+    MIN_DELAY_MS = 20
+    DEFAULT_DELAY_MS = 100
+
+    def __init__(self, buffer_frames: int = 6, cache_bytes: int = 8 << 20, parent=None):
+        super().__init__(parent)
+        self.buffer_frames = buffer_frames
+        self.cache_bytes = cache_bytes
+        self._stream = None
+        self._pending = False
+        self._ended = False
+        self._failed = False
+        self._pass_frames = 0
+        self._queue: deque[tuple[QPixmap, int] | None] = deque()
+        self._loop: list[tuple[QPixmap, int]] | None = []
+        self._loop_bytes = 0
+        self._passes = 0
+        self._loop_count = 0
+        self._elapsed = 0
+        self.min_duration_ms = 0
+
+        self._signals = _AnimationSignals(self)
+        self._signals.decoded.connect(self._on_decoded)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._next_frame)
+
+    @property
+    def is_playing(self) -> bool:
+        return self._stream is not None
+
+    def play(self, path: str, width: int | None, dpr: float, min_duration_ms: int):
+        self.stop()
+        self._stream = _AnimationStream(path, width, dpr)
+        self.min_duration_ms = min_duration_ms
+        self._request()
+
+    def stop(self):
+        """Stop playing and release the decoder and every buffered frame."""
+        self.timer.stop()
+        if self._stream is not None:
+            # A read in progress drops the reader once it sees this
+            self._stream.cancelled = True
+        self._stream = None
+        self._pending = False
+        self._ended = False
+        self._failed = False
+        self._pass_frames = 0
+        self._queue.clear()
+        self._loop = []
+        self._loop_bytes = 0
+        self._passes = 0
+        self._elapsed = 0
+
+    def _request(self):
+        if self._stream is None or self._pending or self._ended:
+            return  # Stopped, or waiting for frames already asked for
+        if len(self._queue) >= self.buffer_frames:
+            return
+        self._pending = True
+        count = self.buffer_frames - len(self._queue)
+        image_decoder().submit(self._stream.read, count, self._signals)
+
+    def _on_decoded(
+        self, stream, frames: list, ended: bool, failed: bool, loop_count: int
+    ):
+        if stream is not self._stream:
+            return
+        self._pending = False
+        self._failed = self._failed or failed
+        self._loop_count = loop_count
+        for image, delay in frames:
+            if delay <= 10:
+                delay = self.DEFAULT_DELAY_MS
+            frame = (QPixmap.fromImage(image), max(self.MIN_DELAY_MS, delay))
+            self._queue.append(frame)
+            if self._loop is not None:
+                self._loop.append(frame)
+                self._loop_bytes += image.sizeInBytes()
+                if self._loop_bytes > self.cache_bytes:
+                    self._loop = None  # Too long to keep, stream every pass
+        if ended:
+            self._ended = True
+            self._queue.append(None)  # End of a pass
+        if not self.timer.isActive():
+            self._next_frame()
+        self._request()
+
+    def _next_frame(self):
+        if not self._queue:
+            return  # Resumes when the next frames are decoded
+        frame = self._queue.popleft()
+        if frame is None:
+            self._passes += 1
+            passes = self._loop_count + 1 if self._loop_count >= 0 else None
+            done = self._passes >= passes if passes else False
+            if self._failed or not self._pass_frames:
+                self.stop()
+                self.failed.emit()
+                return
+            self._pass_frames = 0
+            if done or (passes is None and self._elapsed >= self.min_duration_ms):
+                self.stop()
+                self.finished.emit()
+                return
+            if self._loop:
+                # Replay the kept frames, nothing left to decode
+                self._queue.extend(self._loop)
+                self._queue.append(None)
+            else:
+                self._ended = False
+                self._request()
+            self._next_frame()
+            return
+
+        pixmap, delay = frame
+        self.frame_ready.emit(pixmap)
+        self._pass_frames += 1
+        self._elapsed += delay
+        self.timer.start(delay)
+        self._request()
+
+
+class ImageSlideshow(VisibilityLifecycleMixin, QWidget):
+    """Shows images in turn, `delay_ms` each, and animations for their length."""
+
+    PREFETCH_AHEAD = 2
+
+    def __init__(self, image_paths, delay_ms=2000, source=None, width=None):
+        super().__init__()
+
+        self.image_paths = image_paths
+        self.delay_ms = delay_ms
+        # Width the slideshow will be laid out at, to decode for while hidden
+        self.layout_width = width
+        self.current_index = 0
+        self._waiting_for = None
+
+        self.layout = QVBoxLayout()
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.layout.addWidget(self.image_label)
+        self.setLayout(self.layout)
+
+        self.image_cache = SlideshowImageCache(source=source, parent=self)
+        self.image_cache.image_ready.connect(self._on_image_ready)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.show_next_image)
+
+        self.player = AnimationPlayer(parent=self)
+        self.player.frame_ready.connect(self.image_label.setPixmap)
+        self.player.finished.connect(self.show_next_image)
+        # Show whatever is on screen for as long as a still image instead
+        self.player.failed.connect(lambda: self.timer.start(self.delay_ms))
+
+    def start_animations(self):
+        self.show_next_image()
+
+    def stop_animations(self):
+        self.timer.stop()
+        self.player.stop()
+        self._waiting_for = None
+
+    def _target_width(self):
+        """Width to fit images into, the label's or the one it will have."""
+        if self.image_label.isVisible():
+            return self.image_label.contentsRect().width()
+        if self.layout_width is None:
+            return None
+        margins = self.layout.contentsMargins()
+        label_margins = self.image_label.contentsMargins()
+        return (
+            self.layout_width
+            - margins.left()
+            - margins.right()
+            - label_margins.left()
+            - label_margins.right()
+        )
+
+    def prefetch(self, index: int):
+        """Decode the image at `index` and the few after it in the background."""
+        # A library's list can be replaced by a rescan at any time, index
+        # one copy of it
+        paths = self.image_paths[:]
+        if not paths:
+            return
+        width, dpr = self._target_width(), self.devicePixelRatioF()
+        for offset in range(self.PREFETCH_AHEAD + 1):
+            path = paths[(index + offset) % len(paths)]
+            self.image_cache.prefetch(path, width, dpr)
+
+    def show_next_image(self):
+        paths = self.image_paths[:]
+        if not paths:
+            return
+        if self.current_index >= len(paths):
+            self.current_index = 0
+
+        request = (
+            paths[self.current_index],
+            self._target_width(),
+            self.devicePixelRatioF(),
+        )
+        self.player.stop()
+        self.timer.start(self.delay_ms)
+        pixmap = self.image_cache.get(*request)
+        if pixmap is not None:
+            self.image_label.setPixmap(pixmap)
+            self._waiting_for = None
+            self._play_if_animated(request)
+        else:
+            # Keep the previous frame until the decoded image arrives
+            self._waiting_for = request
+        self.prefetch(self.current_index)
+        self.current_index += 1
+
+    def _play_if_animated(self, request: tuple):
+        """Hand an animated image over to the player, which decides its duration."""
+        path, width, dpr = request
+        if self.image_cache.is_animated(path):
+            self.timer.stop()
+            self.player.play(path, width, dpr, self.delay_ms)
+
+    def set_images(self, image_paths, source=None):
+        """Show `image_paths` from `source` instead, from the first one."""
+        self.timer.stop()
+        self.player.stop()
+        self.image_cache.deleteLater()
+        self.image_cache = SlideshowImageCache(source=source, parent=self)
+        self.image_cache.image_ready.connect(self._on_image_ready)
+        self.image_paths = image_paths
+        self.current_index = 0
+        self._waiting_for = None
+        self.prefetch(self.current_index)
+        if self.isVisible():
+            self.show_next_image()
+
+    def refresh(self):
+        """Pick up changes to the list of images."""
+        if self.isVisible():
+            self.prefetch(self.current_index)
+            if self.image_label.pixmap().isNull():
+                self.show_next_image()
+
+    def _on_image_ready(self, request: tuple):
+        if request != self._waiting_for:
+            return
+        pixmap = self.image_cache.get(*request)
+        if pixmap is not None:
+            self.image_label.setPixmap(pixmap)
+            self._waiting_for = None
+            self._play_if_animated(request)
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ParentChange and not self.isVisible():
+            # Placed in its window, whose style decides the layout margins;
+            # decode the first images at the width they will be shown at
+            self.prefetch(self.current_index)
+        return super().event(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+
+
+_library = None
+
+
+def exercise_library() -> ExerciseLibrary | None:
+    """The user's exercise library, None if its folder does not exist."""
+    global _library
+    if _library is None and LIBRARY_DIR.is_dir():
+        _library = ExerciseLibrary()
+    return _library
+
+
+def _builtin_slideshow(width: int | None) -> ImageSlideshow:
+    atlas = load_atlas(get_resource_path(ATLAS_PATH))
+    if atlas is not None:
+        return ImageSlideshow(atlas.names(), delay_ms=10000, source=atlas, width=width)
+    return ImageSlideshow(
+        [get_resource_path(f) for f in EXERCISE_IMAGES], delay_ms=10000, width=width
+    )
+
+
+def _on_library_rescanned(slideshow: ImageSlideshow, library: ExerciseLibrary):
+    if slideshow.image_paths is library:
+        slideshow.refresh()
+    elif len(library):
+        # The first scan found images, they replace the built-in ones
+        slideshow.set_images(library, source=library)
+
+
+def create_widget(window) -> ImageSlideshow:
+    # The break window has a fixed width, which the slideshow fills
+    width = window.maximumWidth() if window.minimumWidth() else None
+    library = exercise_library()
+    if library is None:
+        return _builtin_slideshow(width)
+
+    if len(library):
+        # The library itself is the slideshow's list of paths
+        slideshow = ImageSlideshow(library, delay_ms=10000, source=library, width=width)
+    else:
+        # Nothing indexed yet: show the built-in images until the first scan,
+        # which runs in the background like every other, finds some
+        slideshow = _builtin_slideshow(width)
+    watcher = LibraryWatcher(library, image_decoder(), parent=slideshow)
+    watcher.rescanned.connect(lambda: _on_library_rescanned(slideshow, library))
+    watcher.rescan()
+    return slideshow
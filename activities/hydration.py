@@ -0,0 +1,223 @@
+"""Hydration: a glass that fills up with every glass of water drunk."""
+from collections import OrderedDict
+
+from PyQt6.QtCore import QEasingCurve
+from PyQt6.QtCore import QPointF
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QVariantAnimation
+from PyQt6.QtGui import QColor
+from PyQt6.QtGui import QPainter
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QHBoxLayout
+from PyQt6.QtWidgets import QPushButton
+from PyQt6.QtWidgets import QVBoxLayout
+from PyQt6.QtWidgets import QWidget
+
+
+def cached_bytes() -> int:
+    return sum(
+        frame.width() * frame.height() * 4 for frame in GlassWidget._frames.values()
+    )
+
+
+def release_caches():
+    GlassWidget._frames.clear()
+
+
+class GlassWidget(QWidget):
+    """Glass filled with one layer of water per glass drunk.
+
+    Frames are rendered once into pixmaps cached by widget size, fill,
+    level count and device pixel ratio, so a repaint is a single blit.
+    Changes of `current_level` animate the fill through `FILL_STEPS`
+    cached frames per level.
+    """
+
+    FILL_STEPS = 8
+    CACHE_SIZE = 128
+    WATER_COLOR = QColor(0, 128, 255, 200)
+
+    # Rendered frames shared by every glass
+    _frames: OrderedDict[tuple, QPixmap] = OrderedDict()
+
+    def __init__(
+        self,
+        parent=None,
+        size: int = 200,
+        max_levels: int = 5,
+        fill_duration: int = 300,
+    ):
+        super().__init__(parent)
+        self._current_level = 0
+        self.max_levels = max_levels
+        self.setFixedSize(size, size)
+
+        # Fill shown on screen, in levels, animated towards current_level
+        self._fill = 0.0
+        self.fill_animation = QVariantAnimation(self)
+        self.fill_animation.setDuration(fill_duration)
+        self.fill_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self.fill_animation.valueChanged.connect(self._set_fill)
+
+    @property
+    def current_level(self) -> int:
+        return self._current_level
+
+    @current_level.setter
+    def current_level(self, level: int):
+        level = max(0, min(self.max_levels, level))
+        self._current_level = level
+        self.fill_animation.stop()
+        if self.isVisible() and self.fill_animation.duration() > 0:
+            self.fill_animation.setStartValue(self._fill)
+            self.fill_animation.setEndValue(float(level))
+            self.fill_animation.start()
+        else:
+            self._set_fill(float(level))
+
+    def _set_fill(self, fill: float):
+        if fill != self._fill:
+            self._fill = fill
+            self.update()
+
+    def frame_key(self) -> tuple:
+        step = round(self._fill * self.FILL_STEPS)
+        dpr = self.devicePixelRatioF()
+        return (self.width(), self.height(), step, self.max_levels, dpr)
+
+    def frame(self) -> QPixmap:
+        """Return the cached frame for the current fill, rendering it on a miss."""
+        key = self.frame_key()
+        pixmap = self._frames.get(key)
+        if pixmap is not None:
+            self._frames.move_to_end(key)
+            return pixmap
+
+        pixmap = self._render(*key)
+        self._frames[key] = pixmap
+        if len(self._frames) > self.CACHE_SIZE:
+            self._frames.popitem(last=False)
+        return pixmap
+
+    @classmethod
+    def _render(cls, width, height, step, max_levels, dpr) -> QPixmap:
+        pixmap = QPixmap(round(width * dpr), round(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        # Proportions of the original 200 x 200 glass
+        size = min(width, height)
+        glass_top_width = size * 0.7
+        glass_bottom_width = size * 0.5
+        glass_height = size * 0.75
+        glass_bottom_y = size * 0.05 + glass_height
+        level_gap = size * 0.025
+        level_height = glass_height / max_levels
+        widening = (glass_top_width - glass_bottom_width) / max_levels
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(cls.WATER_COLOR)
+
+        fill = step / cls.FILL_STEPS
+        i = 0
+        while i < fill:
+            # The top layer is only partly filled while the fill animates
+            fraction = min(1.0, fill - i)
+            bottom_level_y = glass_bottom_y - i * level_height
+            top_level_y = bottom_level_y - (level_height - level_gap) * fraction
+            bottom_width = glass_bottom_width + i * widening
+            top_width = bottom_width + fraction * widening
+            painter.drawPolygon(
+                [
+                    QPointF((width - top_width) / 2, top_level_y),
+                    QPointF((width + top_width) / 2, top_level_y),
+                    QPointF((width + bottom_width) / 2, bottom_level_y),
+                    QPointF((width - bottom_width) / 2, bottom_level_y),
+                ]
+            )
+            i += 1
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.frame())
+
+
+class DrinkingGlassWidget(QWidget):
+    def __init__(self, glass_size: int = 200, glass_levels: int = 5):
+        super().__init__()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 10)
+        self.glass_widget = GlassWidget(size=glass_size, max_levels=glass_levels)
+
+        button_layout = QHBoxLayout()
+
+        common_button_style = """
+            QPushButton {
+                background-color: #f0f0f0;
+                border: 1px solid #c0c0c0;
+                border-radius: 5px;
+                padding: 5px;
+                color: black;
+            }
+            QPushButton:hover {
+                background-color: #e0e0e0;
+            }
+            QPushButton:pressed {
+                background-color: #d0d0d0;
+            }
+        """
+
+        self.plus_button = QPushButton("+")
+        self.plus_button.setFixedSize(40, 40)
+        self.plus_button.clicked.connect(self.increase_level)
+        self.plus_button.setStyleSheet(
+            common_button_style
+            + """
+            QPushButton {
+                font-size: 14px;
+            }
+        """
+        )
+
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.setFixedSize(60, 40)
+        self.reset_button.clicked.connect(self.reset_level)
+        self.reset_button.setStyleSheet(
+            common_button_style
+            + """
+            QPushButton {
+                font-size: 10px;
+            }
+        """
+        )
+
+        button_layout.addWidget(self.plus_button)
+        button_layout.addWidget(self.reset_button)
+
+        layout.addWidget(self.glass_widget)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def increase_level(self):
+        if self.glass_widget.current_level < self.glass_widget.max_levels:
+            self.glass_widget.current_level += 1
+
+    def reset_level(self):
+        self.glass_widget.current_level = 0
+
+    def glasses_drunk(self) -> int:
+        return self.glass_widget.current_level
+
+    def reset(self):
+        """Start the next break with an empty glass."""
+        self.reset_level()
+
+
+def create_widget(window) -> DrinkingGlassWidget:
+    return DrinkingGlassWidget()
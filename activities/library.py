@@ -0,0 +1,250 @@
+"""User exercise library: a folder of images shown in the exercise slideshow.
+
+Images dropped into LIBRARY_DIR, in any subfolder, are shown in natural
+order of their relative paths, so "step-2" comes before "step-10". The
+folder is indexed with os.scandir and the index is kept on disk, keyed by
+size and mtime, so a rescan only looks at files that changed and startup
+only reads the index. Images are shown from thumbnails as wide as the
+slideshow, cached on disk by content hash and device pixel ratio, and
+nothing is decoded until the slideshow asks for it.
+
+All scanning, hashing and decoding runs on the slideshow's image decoder
+thread.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import QFileSystemWatcher
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QImage
+from PyQt6.QtGui import QImageReader
+
+LIBRARY_DIR = Path.home() / ".local" / "share" / "active_breaks" / "exercises"
+CACHE_DIR = Path.home() / ".cache" / "active_breaks" / "library"
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
+# Width of the thumbnails, the width of the break window
+THUMBNAIL_WIDTH = 200
+# Content hashes found while making thumbnails are saved at most this often
+SAVE_INTERVAL = 10.0
+
+
+def _natural_key(path: str) -> list:
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+class ExerciseLibrary:
+    """Sequence of the image paths in a folder, backed by an on-disk index.
+
+    Indexing and item access are cheap; `image` is where decoding happens,
+    through the thumbnail cache.
+    """
+
+    def __init__(self, directory: Path = LIBRARY_DIR, cache_dir: Path = CACHE_DIR):
+        self.directory = Path(directory)
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "index.json"
+        # Paths are plain strings, pathlib is too slow for thousands of them
+        self._prefix = os.path.join(str(self.directory), "")
+        # Relative path -> [size, mtime_ns, content hash or None]
+        self._files: dict[str, list] = {}
+        self._paths: list[str] = []
+        self._unsaved = False
+        self._saved_at = 0.0
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        # A rescan replaces the list rather than changing it, so a slice is
+        # a consistent copy
+        return self._paths[index]
+
+    def directories(self) -> list[str]:
+        """The library folder and every subfolder holding indexed images."""
+        folders = {str(self.directory)}
+        folders.update(os.path.dirname(path) for path in self._paths)
+        return sorted(folders)
+
+    def _relative(self, path: str) -> str:
+        return path[len(self._prefix) :]
+
+    def _load_index(self):
+        try:
+            data = json.loads(self.index_path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logging.exception("Ignoring invalid library index %s", self.index_path)
+            return
+        if data.get("directory") != str(self.directory):
+            return
+        # Saved in display order, no need to sort again
+        self._files = data.get("files", {})
+        self._update_paths()
+
+    def _save_index(self):
+        self._unsaved = False
+        self._saved_at = time.monotonic()
+        data = {"directory": str(self.directory), "files": self._files}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temporary = self.index_path.with_suffix(".tmp")
+            temporary.write_text(json.dumps(data))
+            os.replace(temporary, self.index_path)
+        except OSError:
+            logging.exception("Unable to save the library index")
+
+    def _update_paths(self):
+        # Swapped in one assignment, so readers on other threads see either
+        # the old or the new list
+        self._paths = [self._prefix + path for path in self._files]
+
+    def _scan(self, directory: str, found: dict[str, os.stat_result]):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        self._scan(entry.path, found)
+                    elif os.path.splitext(entry.name)[1].lower() in IMAGE_SUFFIXES:
+                        found[entry.path] = entry.stat()
+        except OSError:
+            logging.warning("Unable to scan %s", directory)
+
+    def rescan(self) -> bool:
+        """Bring the index up to date with the folder; True if anything changed."""
+        found: dict[str, os.stat_result] = {}
+        if self.directory.is_dir():
+            self._scan(str(self.directory), found)
+
+        found = {self._relative(path): stat for path, stat in found.items()}
+        if found.keys() == self._files.keys():
+            order = list(self._files)
+        else:
+            order = sorted(found, key=_natural_key)
+
+        files = {}
+        changed = False
+        for relative in order:
+            stat = found[relative]
+            entry = self._files.get(relative)
+            if entry is None or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+                # New or modified, hashed again when it is next shown
+                entry = [stat.st_size, stat.st_mtime_ns, None]
+                changed = True
+            files[relative] = entry
+        changed = changed or list(files) != list(self._files)
+        if changed:
+            self._files = files
+            self._update_paths()
+            logging.info("Exercise library: %d images", len(files))
+        if changed or self._unsaved:
+            self._save_index()
+        return changed
+
+    def version(self, path: str) -> object:
+        entry = self._files.get(self._relative(path))
+        return None if entry is None else tuple(entry[:2])
+
+    def _digest(self, path: str) -> str | None:
+        entry = self._files.get(self._relative(path))
+        if entry is None:
+            return None
+        if entry[2] is None:
+            digest = hashlib.blake2b(digest_size=16)
+            try:
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 16), b""):
+                        digest.update(chunk)
+            except OSError:
+                return None
+            entry[2] = digest.hexdigest()
+        return entry[2]
+
+    def image(self, path: str, dpr: float = 1.0, width: int = None) -> QImage:
+        """The thumbnail of the image at `path`, made on first use.
+
+        `width` is only a hint, thumbnails are THUMBNAIL_WIDTH wide.
+        """
+        pixels = round(THUMBNAIL_WIDTH * dpr)
+        digest = self._digest(path)
+        thumbnail = None
+        if digest is not None:
+            thumbnail = self.cache_dir / "thumbnails" / f"{digest}@{dpr:g}x.png"
+            image = QImage(str(thumbnail))
+            if not image.isNull():
+                image.setDevicePixelRatio(dpr)
+                return image
+
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid() and size.width() > pixels:
+            # Formats like JPEG decode straight to the smaller size
+            reader.setScaledSize(
+                QSize(pixels, max(1, round(size.height() * pixels / size.width())))
+            )
+        image = reader.read()
+        if image.isNull():
+            logging.warning("Unable to decode image %s: %s", path, reader.errorString())
+            return image
+        if thumbnail is not None:
+            thumbnail.parent.mkdir(parents=True, exist_ok=True)
+            if not image.save(str(thumbnail)):
+                logging.warning("Unable to save thumbnail %s", thumbnail)
+            # Keep the content hash for next time, without rewriting the
+            # whole index for every image of a first pass
+            self._unsaved = True
+            if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+                self._save_index()
+        image.setDevicePixelRatio(dpr)
+        return image
+
+
+class LibraryWatcher(QObject):
+    """Rescans a library shortly after any of its folders change."""
+
+    rescanned = pyqtSignal()
+
+    def __init__(self, library: ExerciseLibrary, executor, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.executor = executor
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_changed)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(500)
+        self._rescan_timer.timeout.connect(self.rescan)
+        self.rescanned.connect(self._watch)
+        self._watch()
+
+    def _watch(self):
+        directories = [d for d in self.library.directories() if os.path.isdir(d)]
+        missing = set(directories) - set(self._watcher.directories())
+        if missing:
+            self._watcher.addPaths(sorted(missing))
+
+    def _on_changed(self, _path: str):
+        self._rescan_timer.start()
+
+    def rescan(self):
+        """Rescan the library on the executor's thread."""
+        self.executor.submit(self._rescan)
+
+    def _rescan(self):
+        if self.library.rescan():
+            try:
+                self.rescanned.emit()
+            except RuntimeError:
+                pass  # The watcher was deleted during the rescan
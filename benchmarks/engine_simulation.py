@@ -0,0 +1,112 @@
+"""Simulates weeks of work/break cycles on the Qt-free engine.
+
+Drives BreakEngine with a VirtualClock, starting work again as soon as a
+break finishes, and checks the cycle invariants along the way. A
+ReminderScheduler with --reminders recurring rules runs alongside, woken
+only at the earliest of its and the engine's deadlines, the way the tray
+app arms its single wakeup timer. PyQt6 is never imported.
+
+Usage:
+    python benchmarks/engine_simulation.py [--weeks N] [--reminders N] [--seed S]
+        [--output FILE]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from engine import BreakEngine  # noqa: E402
+from engine import Phase  # noqa: E402
+from engine import VirtualClock  # noqa: E402
+from reminders import Reminder  # noqa: E402
+from reminders import ReminderScheduler  # noqa: E402
+
+# Every transition the engine is allowed to make on its own
+AUTOMATIC = {
+    (Phase.WORK, Phase.BREAK_PENDING),
+    (Phase.BREAK_PENDING, Phase.BREAK),
+    (Phase.BREAK, Phase.IDLE),
+}
+
+
+def simulate(weeks: int, seed: int, reminder_count: int = 0) -> dict:
+    clock = VirtualClock()
+    engine = BreakEngine(clock=clock, rng=random.Random(seed))
+    transitions = []
+    engine.subscribe(transitions.append)
+
+    reminders = ReminderScheduler(clock=clock)
+    for i in range(reminder_count):
+        interval = random.randint(5, 120) * 60
+        reminders.add(Reminder(f"rule {i}", f"Activity {i}", interval=interval))
+
+    def on_transition(transition):
+        if transition.phase in (Phase.BREAK_PENDING, Phase.BREAK):
+            reminders.hold()
+        elif reminders.is_held:
+            satisfied = transition.previous is Phase.BREAK
+            reminders.release(transition.at, satisfied=satisfied)
+
+    engine.subscribe(on_transition)
+
+    end = weeks * 7 * 24 * 3600
+    wakeups = shown = 0
+    engine.start_work()
+    while clock.now < end:
+        # Jump straight to the next deadline, sometimes overshooting it as
+        # a suspended machine would
+        deadlines = [engine.next_deadline(), reminders.next_deadline()]
+        deadline = min(deadline for deadline in deadlines if deadline is not None)
+        clock.now = deadline + random.choice((0, 0, 0, 7200))
+        wakeups += 1
+        for transition in engine.poll():
+            assert (transition.previous, transition.phase) in AUTOMATIC
+        break_at = engine.next_deadline() if engine.is_working else None
+        shown += len(reminders.poll(break_at=break_at))
+        if engine.phase is Phase.IDLE:
+            engine.start_work()
+
+    breaks = [t for t in transitions if t.phase is Phase.BREAK]
+    # Activities are shown in rounds, each one before any repeats
+    rounds = len(engine.activities)
+    for i in range(0, len(breaks) - rounds + 1, rounds):
+        assert len({t.activity for t in breaks[i : i + rounds]}) == rounds
+    assert "PyQt6" not in sys.modules
+    return {
+        "transitions": len(transitions),
+        "breaks": len(breaks),
+        "wakeups": wakeups,
+        "reminders_shown": shown,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--reminders", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    start = time.perf_counter()
+    results = simulate(args.weeks, args.seed, args.reminders)
+    results["seconds"] = time.perf_counter() - start
+    results["weeks"] = args.weeks
+    print(
+        f"{args.weeks} weeks: {results['breaks']} breaks, "
+        f"{results['transitions']} transitions, {results['reminders_shown']} "
+        f"reminders in {results['wakeups']} wakeups, "
+        f"{results['seconds'] * 1000:.1f} ms"
+    )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Logging overhead benchmark for the per-tick tray handlers.
+
+Times `update_timer`, `update_icon` and `blink_icon` on the offscreen QPA
+platform with the root logger at INFO (the default) and with logging
+disabled entirely. The difference is what logging costs per tick.
+
+Usage:
+    python benchmarks/logging_overhead.py [--calls N] [--output FILE]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+
+def time_per_call(func, calls: int) -> float:
+    """Return the mean time of `func()` in microseconds."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure(tray: main.ActiveBreaksApp, calls: int) -> dict[str, float]:
+    tray.start_work()
+    return {
+        "update_timer": time_per_call(tray.update_timer, calls),
+        "update_icon": time_per_call(lambda: tray.update_icon(0.5), calls),
+        "blink_icon": time_per_call(tray.blink_icon, calls),
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    # Records at INFO and above still reach a handler, as in the real app
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()])
+    app = QApplication(sys.argv[:1])  # noqa: F841
+    # Keeps the sessions measured here out of the user's journal
+    scratch = tempfile.TemporaryDirectory(prefix="active-breaks-bench-")
+    tray = main.ActiveBreaksApp(
+        journal_dir=Path(scratch.name),
+        settings_file=str(Path(scratch.name) / "settings.conf"),
+    )
+
+    results = {"info": measure(tray, args.calls)}
+    logging.disable(logging.CRITICAL)
+    results["disabled"] = measure(tray, args.calls)
+    logging.disable(logging.NOTSET)
+    tray.stop_timer()
+
+    results["overhead"] = {
+        key: results["info"][key] - results["disabled"][key] for key in results["info"]
+    }
+    for key in results["info"]:
+        print(
+            f"{key:<13} info {results['info'][key]:7.2f} us  "
+            f"disabled {results['disabled'][key]:7.2f} us  "
+            f"overhead {results['overhead'][key]:6.2f} us"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    run()
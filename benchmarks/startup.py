@@ -0,0 +1,152 @@
+"""Startup benchmark for Active Breaks.
+
+Launches the app in fresh processes on the offscreen QPA platform and
+reports, in milliseconds since interpreter start:
+
+- import: `import main` finished
+- tray_visible: the tray icon is constructed and visible
+- first_idle: the event loop has processed all startup work
+- rss_mb: peak resident memory once idle, in megabytes
+
+With --terminal the Qt-free terminal front end is measured instead, up to
+`ready`: its first status line is drawn. The tray app runs against settings
+and a journal in a temporary directory, never the user's.
+
+Nearly all of the tray app's startup is importing PyQt6; the work that
+--fast-start defers takes a few milliseconds, so both modes measure about
+the same and share their thresholds.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--fast-start|--terminal] [--output FILE]
+
+Exits with status 1 if a median exceeds its regression threshold.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Regression thresholds (ms) for the medians, per startup mode
+THRESHOLDS = {
+    "default": {"import": 300, "tray_visible": 330, "first_idle": 350},
+    "fast_start": {"import": 300, "tray_visible": 330, "first_idle": 350},
+    "terminal": {"import": 150, "ready": 160, "rss_mb": 25},
+}
+
+CHILD = """
+import time
+start = time.perf_counter()
+import json, resource, sys
+from pathlib import Path
+import main
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+marks = {"import": time.perf_counter()}
+app = QApplication(sys.argv[:1])
+app.setQuitOnLastWindowClosed(False)
+# Keep away from the user's settings and journal
+scratch = Path(sys.argv[1])
+tray = main.ActiveBreaksApp(
+    fast_start=%(fast_start)r,
+    journal_dir=scratch,
+    settings_file=str(scratch / "settings.conf"),
+)
+assert tray.isVisible()
+marks["tray_visible"] = time.perf_counter()
+
+def idle():
+    marks["first_idle"] = time.perf_counter()
+    app.quit()
+
+QTimer.singleShot(0, idle)
+app.exec()
+marks = {k: (v - start) * 1000 for k, v in marks.items()}
+marks["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(marks))
+"""
+
+TERMINAL_CHILD = """
+import time
+start = time.perf_counter()
+import io, json, resource, sys
+import terminal
+
+marks = {"import": time.perf_counter()}
+app = terminal.TerminalApp(terminal.read_settings(), stdin=None, out=io.StringIO())
+app.running = False
+app.run()
+marks["ready"] = time.perf_counter()
+marks = {k: (v - start) * 1000 for k, v in marks.items()}
+marks["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(marks))
+"""
+
+
+def run_once(mode: str) -> dict[str, float]:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    if mode == "terminal":
+        code = TERMINAL_CHILD
+    else:
+        code = CHILD % {"fast_start": mode == "fast_start"}
+    with tempfile.TemporaryDirectory(prefix="active-breaks-bench-") as scratch:
+        result = subprocess.run(
+            [sys.executable, "-c", code, scratch],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--fast-start", action="store_true")
+    modes.add_argument("--terminal", action="store_true")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.terminal:
+        mode = "terminal"
+    else:
+        mode = "fast_start" if args.fast_start else "default"
+    runs = [run_once(mode) for _ in range(args.runs)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+    failures = []
+    for key, median in medians.items():
+        unit = "MB" if key == "rss_mb" else "ms"
+        threshold = THRESHOLDS[mode].get(key)
+        if threshold is None:
+            print(f"{mode:>10} {key:<13} {median:8.1f} {unit}")
+            continue
+        status = "ok" if median <= threshold else "REGRESSION"
+        if median > threshold:
+            failures.append(key)
+        print(
+            f"{mode:>10} {key:<13} {median:8.1f} {unit}  "
+            f"(<= {threshold} {unit}) {status}"
+        )
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {"mode": mode, "runs": runs, "medians": medians, "failures": failures},
+                indent=2,
+            )
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Per-tick and rendering cost benchmarks for the tray app and its widgets.
+
+Runs on the offscreen QPA platform and measures:
+
+- time and Python allocations per call of the tray handlers
+  (`update_timer`, `update_icon`, `blink_icon`)
+- per-paint cost of `BreathingWidget` and `GlassWidget`, the frame rate
+  the breathing animation actually drives, and the CPU time, paints and
+  painted area of one breath cycle, normally and in low-power mode
+- `ImageSlideshow` decode latency and the GUI-thread cost of a cache hit
+  in `show_next_image`, and the cost of a frame from the sprite atlas at
+  each scale when one has been built (`make atlas`)
+- `MultiScreenBlocker.show` latency with N simulated screens and the cost
+  of repainting every blocker once, for each `BlockerMode`. The offscreen
+  platform has no compositor, so the frame cost covers painting and
+  flushing the backing stores but not the window-opacity blending that
+  WINDOW_OPACITY additionally asks of a real compositor
+- end-to-end break start latency, cold and prepared during the pre-break
+  blink
+
+Usage:
+    python benchmarks/widgets.py [--output FILE] [--baseline FILE]
+
+With --baseline, exits with status 1 if any timing is more than
+--tolerance times slower than the baseline results.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import main  # noqa: E402
+from activities.breathing import BreathingWidget  # noqa: E402
+from activities.atlas import load_atlas  # noqa: E402
+from activities.exercises import ATLAS_PATH  # noqa: E402
+from activities.exercises import EXERCISE_IMAGES  # noqa: E402
+from activities.exercises import ImageSlideshow  # noqa: E402
+from activities.hydration import GlassWidget  # noqa: E402
+from PyQt6.QtCore import QEventLoop  # noqa: E402
+from PyQt6.QtCore import QTimer  # noqa: E402
+from PyQt6.QtGui import QImageReader  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+# Keeps the sessions the benchmarks run out of the user's journal
+SCRATCH = tempfile.TemporaryDirectory(prefix="active-breaks-bench-")
+
+
+def make_tray() -> main.ActiveBreaksApp:
+    return main.ActiveBreaksApp(
+        journal_dir=Path(SCRATCH.name),
+        settings_file=str(Path(SCRATCH.name) / "settings.conf"),
+    )
+
+
+def run_event_loop(ms: int):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def per_call(func, calls: int) -> dict[str, float]:
+    """Mean time (us) and Python allocations (bytes) of `func()`."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(calls):
+        func()
+    allocated = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {"us": elapsed / calls * 1e6, "peak_bytes": allocated}
+
+
+def bench_tray(calls: int) -> dict:
+    tray = make_tray()
+    tray.start_work()
+    results = {
+        "update_timer": per_call(tray.update_timer, calls),
+        "update_icon": per_call(lambda: tray.update_icon(0.5), calls),
+        "blink_icon": per_call(tray.blink_icon, calls),
+    }
+    tray.stop_timer()
+    tray.blink_timer.stop()
+    return results
+
+
+def bench_paint(widget, calls: int) -> dict[str, float]:
+    widget.show()
+    run_event_loop(50)
+    result = per_call(widget.repaint, calls)
+    widget.hide()
+    return result
+
+
+def bench_breathing_fps(seconds: float) -> float:
+    widget = BreathingWidget(hold_time=0, breath_time=1000)
+    paints = 0
+    paint_event = widget.paintEvent
+
+    def counting_paint_event(event):
+        nonlocal paints
+        paints += 1
+        paint_event(event)
+
+    widget.paintEvent = counting_paint_event
+    widget.show()
+    run_event_loop(int(seconds * 1000))
+    widget.hide()
+    return paints / seconds
+
+
+def bench_breathing_cycle(**kwargs) -> dict[str, float]:
+    """CPU time, paints and painted area over one inhale/hold/exhale/hold."""
+    widget = BreathingWidget(hold_time=250, breath_time=1500, **kwargs)
+    paints = 0
+    area = 0
+    paint_event = widget.paintEvent
+
+    def counting_paint_event(event):
+        nonlocal paints, area
+        paints += 1
+        rect = event.rect()
+        area += rect.width() * rect.height()
+        paint_event(event)
+
+    widget.paintEvent = counting_paint_event
+    widget.show()
+    run_event_loop(50)
+    paints = area = 0
+    cpu = time.process_time()
+    run_event_loop(2 * (250 + 1500))
+    cpu = time.process_time() - cpu
+    widget.hide()
+    return {"cpu_ms": cpu * 1000, "paints": paints, "painted_kpixels": area / 1000}
+
+
+def bench_slideshow(calls: int) -> dict:
+    paths = [str(ROOT / f) for f in EXERCISE_IMAGES]
+
+    start = time.perf_counter()
+    for path in paths:
+        QImageReader(path).read()
+    decode_ms = (time.perf_counter() - start) / len(paths) * 1000
+
+    slideshow = ImageSlideshow(paths, delay_ms=3600 * 1000)
+    slideshow.image_cache.max_entries = len(paths) * 2
+    slideshow.show()
+    start = time.perf_counter()
+    while slideshow._waiting_for is not None and time.perf_counter() - start < 5:
+        run_event_loop(1)
+    first_frame_ms = (time.perf_counter() - start) * 1000
+
+    # Let the prefetcher fill the cache, then time cache hits on the GUI thread
+    for _ in paths:
+        slideshow.show_next_image()
+        run_event_loop(20)
+    result = {
+        "decode_ms": decode_ms,
+        "first_frame_ms": first_frame_ms,
+        "show_next_image": per_call(slideshow.show_next_image, calls),
+    }
+    slideshow.hide()
+
+    atlas = load_atlas(str(ROOT / ATLAS_PATH))
+    if atlas is not None:
+        for scale in atlas.scales(atlas.names()[0]):
+            start = time.perf_counter()
+            for name in atlas.names():
+                atlas.image(name, scale)
+            elapsed = time.perf_counter() - start
+            result[f"atlas_{scale}x_ms"] = elapsed / len(atlas.names()) * 1000
+    return result
+
+
+class SimulatedScreensBlocker(main.MultiScreenBlocker):
+    """Blocker that covers N copies of the primary screen."""
+
+    def __init__(self, screens: int, mode: main.BlockerMode, fade_in_ms: int = 0):
+        self.screen_count = screens
+        super().__init__(mode=mode, fade_in_ms=fade_in_ms)
+
+    def _sync_screens(self):
+        primary = self._app.primaryScreen()
+        while len(self._blockers) < self.screen_count:
+            blocker = main.FullScreenBlocker(screen=primary, mode=self.mode)
+            blocker.hide()
+            self._blockers[len(self._blockers)] = blocker
+
+
+def bench_blockers(screens: int, runs: int) -> dict:
+    results = {"screens": screens}
+    for mode in main.BlockerMode:
+        blocker = SimulatedScreensBlocker(screens, mode)
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            blocker.show()
+            QApplication.processEvents()
+            timings.append((time.perf_counter() - start) * 1000)
+            blocker.hide()
+            QApplication.processEvents()
+
+        blocker.show()
+        QApplication.processEvents()
+        blockers = list(blocker._blockers.values())
+        start = time.perf_counter()
+        for _ in range(runs * 4):
+            for window in blockers:
+                window.repaint()
+        frame_ms = (time.perf_counter() - start) * 1000 / (runs * 4)
+        blocker.hide()
+
+        # One shared animation fades every screen in
+        blocker.fade_in_ms = 300
+        fade_frames = 0
+
+        def count_fade_frame(_value):
+            nonlocal fade_frames
+            fade_frames += 1
+
+        blocker._fade.valueChanged.connect(count_fade_frame)
+        blocker.show()
+        run_event_loop(400)
+        blocker.hide()
+        results[mode.value] = {
+            "show_ms": min(timings),
+            "frame_ms": frame_ms,
+            "fade_in_frames": fade_frames,
+        }
+    return results
+
+
+def bench_break_start() -> dict[str, float]:
+    # Cold: the break starts from the menu with nothing built yet
+    tray = make_tray()
+    tray.start_break()
+    cold = tray.break_start_latency
+    tray.stop_timer()
+    tray.blink_timer.stop()
+
+    # Prepared: work runs out and the break is built during the pre-break blink
+    tray = make_tray()
+    tray.work_duration = 0
+    tray.engine.break_delay = 0.2
+    tray.start_work()
+    run_event_loop(500)
+    prepared = tray.break_start_latency
+    tray.stop_timer()
+    tray.blink_timer.stop()
+    return {"cold_ms": cold, "prepared_ms": prepared}
+
+
+def compare(results, baseline, tolerance: float, path="") -> list[str]:
+    """Return the timing keys that regressed against the baseline."""
+    regressions = []
+    for key, value in results.items():
+        name = f"{path}.{key}" if path else key
+        if isinstance(value, dict) and isinstance(baseline.get(key), dict):
+            regressions += compare(value, baseline[key], tolerance, name)
+        elif key in ("us", "ms") or key.endswith("_ms"):
+            old = baseline.get(key)
+            if old and value > old * tolerance:
+                regressions.append(f"{name}: {old:.2f} -> {value:.2f}")
+    return regressions
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--screens", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare with earlier results")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])  # noqa: F841
+    glass = GlassWidget()
+    glass.current_level = glass.max_levels
+    results = {
+        "tray": bench_tray(args.calls),
+        "paint": {
+            "breathing": bench_paint(BreathingWidget(), args.calls // 10),
+            "glass": bench_paint(glass, args.calls // 10),
+            "breathing_fps": bench_breathing_fps(2),
+            "breathing_cycle": bench_breathing_cycle(),
+            "breathing_cycle_low_power": bench_breathing_cycle(low_power=True),
+        },
+        "slideshow": bench_slideshow(args.calls),
+        "blockers": bench_blockers(args.screens, 5),
+        "break_start": bench_break_start(),
+    }
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    run()
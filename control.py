@@ -0,0 +1,87 @@
+"""Command-line control of a running Active Breaks instance.
+
+The tray app listens on a local socket; this module talks to it without
+importing PyQt6, so scripts, hotkey daemons and calendar hooks get an
+answer in a few milliseconds. Each request and response is one line of
+JSON.
+
+Usage:
+    python control.py status|diagnostics|memory|start-work|start-break|stop
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+from pathlib import Path
+
+COMMANDS = ["status", "diagnostics", "memory", "start-work", "start-break", "stop"]
+
+
+def socket_path() -> str:
+    """Path of the control socket, private to the current user."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return str(Path(runtime_dir) / "active-breaks.sock")
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    return str(Path(tempfile.gettempdir()) / f"active-breaks-{user}.sock")
+
+
+def is_listening(path: str = None, timeout: float = 0.5) -> bool:
+    """Whether an instance accepts connections on the socket at `path`.
+
+    A socket file nobody listens on, left behind by a crash, refuses the
+    connection; a busy instance may only be slow to accept it.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(path or socket_path())
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+        except OSError:
+            return True
+    return True
+
+
+def send(request: dict, path: str = None, timeout: float = 2.0) -> dict:
+    """Send one request to the running app and return its response.
+
+    Raises FileNotFoundError or ConnectionRefusedError if no instance is
+    listening, and another OSError, like TimeoutError, if one is but fails
+    to answer.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Local sockets are not supported on this platform")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path or socket_path())
+        client.sendall(json.dumps(request).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    if not data:
+        raise OSError("The running instance closed the connection")
+    return json.loads(data)
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        print("Usage: python control.py " + "|".join(COMMANDS), file=sys.stderr)
+        sys.exit(2)
+    try:
+        response = send({"command": sys.argv[1]})
+    except OSError as e:
+        print(f"Active Breaks is not running: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(response, indent=2))
+    sys.exit(0 if response.get("ok") else 1)
+
+
+if __name__ == "__main__":
+    main()
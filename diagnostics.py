@@ -0,0 +1,217 @@
+"""GUI responsiveness metrics: per-handler latency histograms and stalls.
+
+Handlers run inside `Diagnostics.measure`, which times them into a
+histogram per name; handlers measured inside another one get their own
+histogram too. A watchdog thread sleeps until a handler starts and
+wakes `stall_threshold` later: if the handler is still running, the GUI
+thread is stalled and a sample of its stack is recorded with the stall.
+Nothing runs while no handler does, so an idle app gets no extra wakeups.
+Event-loop latency, how late a timer fires, is recorded with `record`
+under "event_loop". Nothing in this module imports PyQt6.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from contextlib import contextmanager
+from pathlib import Path
+
+from engine import monotonic
+
+# Histogram bucket upper bounds, in milliseconds; the last bucket is open
+BUCKETS_MS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
+
+
+class LatencyHistogram:
+    """Counts of durations in power-of-two millisecond buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000
+        bucket = 0
+        while bucket < len(BUCKETS_MS) and ms > BUCKETS_MS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (ms) of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                if bucket < len(BUCKETS_MS):
+                    return min(float(BUCKETS_MS[bucket]), self.max)
+                return self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max, 3),
+            "buckets_ms": {
+                f"<={bound}" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}": count
+                for i, (bound, count) in enumerate(
+                    zip(BUCKETS_MS + [None], self.counts)
+                )
+                if count
+            },
+        }
+
+
+class Diagnostics:
+    """Latency histograms by handler name and a watchdog for GUI stalls."""
+
+    def __init__(
+        self,
+        stall_threshold: float = 0.2,
+        max_stalls: int = 50,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.stall_threshold = stall_threshold
+        self.max_stalls = max_stalls
+        self._clock = clock
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.stalls: list[dict] = []
+        self.started_at = time.time()
+
+        # The handlers running on the GUI thread, outermost first, and when
+        # the outermost one started; shared with the watchdog
+        self._lock = threading.Lock()
+        self._handlers: list[str] = []
+        self._running: tuple[float, int] | None = None
+        self._calls = 0
+        self._handler_started = threading.Event()
+        self._gui_thread = threading.get_ident()
+        self._watchdog = None
+
+    def start(self):
+        """Start the watchdog thread; call from the GUI thread."""
+        self._gui_thread = threading.get_ident()
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="stall-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def record(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def measure(self, name: str):
+        """Time the enclosed code as the handler `name`."""
+        started = self._clock()
+        with self._lock:
+            outermost = not self._handlers
+            self._handlers.append(name)
+            if outermost:
+                self._calls += 1
+                self._running = (started, self._calls)
+        if outermost:
+            self._handler_started.set()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._handlers.pop()
+                if outermost:
+                    self._running = None
+            self.record(name, self._clock() - started)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """Wrap `func` so every call is measured as the handler `name`.
+
+        Arguments a signal passes, like the `checked` of QAction.triggered,
+        are dropped: `func` is called without any.
+        """
+
+        def wrapper(*_args):
+            with self.measure(name):
+                return func()
+
+        return wrapper
+
+    def _watch(self):
+        while True:
+            self._handler_started.wait()
+            self._handler_started.clear()
+            with self._lock:
+                running = self._running
+            if running is None:
+                continue
+            started, call = running
+            delay = started + self.stall_threshold - self._clock()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._lock:
+                if self._running is None or self._running[1] != call:
+                    continue
+                name = " > ".join(self._handlers)
+            frame = sys._current_frames().get(self._gui_thread)
+            stack = traceback.format_stack(frame, limit=20) if frame else []
+            stall = {
+                "time": time.time(),
+                "handler": name,
+                "running_ms": round((self._clock() - started) * 1000, 1),
+                "stack": [line.rstrip() for line in stack],
+            }
+            logging.warning(
+                "GUI stalled in %s for over %.0f ms", name, stall["running_ms"]
+            )
+            self.stalls.append(stall)
+            del self.stalls[: -self.max_stalls]
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started_at,
+            "time": time.time(),
+            "stall_threshold_ms": self.stall_threshold * 1000,
+            "histograms": {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self.histograms.items())
+            },
+            "stalls": list(self.stalls),
+        }
+
+    def dump(self, path: Path, **sections):
+        """Write all metrics, and any extra `sections`, as JSON to `path`."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict() | sections, indent=2))
+
+    def summary(self) -> str:
+        """A few lines on the slowest handlers and the recorded stalls."""
+        lines = []
+        slowest = sorted(
+            self.histograms.items(), key=lambda item: item[1].max, reverse=True
+        )
+        for name, histogram in slowest[:8]:
+            lines.append(
+                f"{name}: {histogram.count} calls, "
+                f"p50 {histogram.percentile(0.5):.0f} ms, "
+                f"p99 {histogram.percentile(0.99):.0f} ms, "
+                f"max {histogram.max:.0f} ms"
+            )
+        threshold_ms = self.stall_threshold * 1000
+        lines.append(f"{len(self.stalls)} stalls over {threshold_ms:.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,326 @@
+"""Qt-free core of the work/break cycle: phases, deadlines and activities.
+
+Nothing in this module imports PyQt6, so the cycle can be simulated on a
+virtual clock, benchmarked and tested without a display.
+"""
+import logging
+import random
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+
+
+if hasattr(time, "CLOCK_BOOTTIME"):
+    # Linux: unlike CLOCK_MONOTONIC, keeps counting while the machine is suspended
+    def monotonic() -> float:
+        """Return seconds from a monotonic clock that includes suspend time."""
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+elif sys.platform == "darwin":
+    # macOS: CLOCK_MONOTONIC includes sleep, time.monotonic() does not
+    def monotonic() -> float:
+        """Return seconds from a monotonic clock that includes suspend time."""
+        return time.clock_gettime(time.CLOCK_MONOTONIC)
+
+else:
+    monotonic = time.monotonic
+
+
+class PhaseTimer:
+    """Tracks the absolute deadline of the current phase against a monotonic clock."""
+
+    def __init__(self, clock: Callable[[], float] = monotonic):
+        self._clock = clock
+        self.duration = 0.0
+        self.started_at = None
+        self.deadline = None
+        self.paused_at = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.deadline is not None
+
+    @property
+    def is_paused(self) -> bool:
+        return self.paused_at is not None
+
+    def _now(self) -> float:
+        return self._clock() if self.paused_at is None else self.paused_at
+
+    def start(self, duration: float, started_at: float = None):
+        """Start a phase lasting `duration` seconds from now or from `started_at`."""
+        self.duration = float(duration)
+        self.started_at = self._clock() if started_at is None else started_at
+        self.deadline = self.started_at + self.duration
+        self.paused_at = None
+
+    def stop(self):
+        """Forget the current phase."""
+        self.started_at = None
+        self.deadline = None
+        self.paused_at = None
+
+    def pause(self, at: float = None):
+        """Freeze the remaining time as it was at `at` (default now)."""
+        if self.deadline is not None and self.paused_at is None:
+            self.paused_at = self._clock() if at is None else at
+
+    def resume(self, at: float = None):
+        """Continue after a pause, pushing the deadline back by its length."""
+        if self.paused_at is None:
+            return
+        at = self._clock() if at is None else at
+        paused_for = max(0.0, at - self.paused_at)
+        self.started_at += paused_for
+        self.deadline += paused_for
+        self.paused_at = None
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline, never negative."""
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - self._now())
+
+    def elapsed(self) -> float:
+        """Seconds since the phase started, capped at its duration."""
+        if self.started_at is None:
+            return 0.0
+        return min(self.duration, self._now() - self.started_at)
+
+    def progress(self) -> float:
+        """Fraction of the phase that has elapsed, between 0 and 1."""
+        if self.deadline is None or self.duration <= 0:
+            return 0.0
+        return 1 - self.remaining() / self.duration
+
+    def expired(self) -> bool:
+        return self.deadline is not None and self._now() >= self.deadline
+
+
+class VirtualClock:
+    """Manually advanced clock for simulations and tests."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+DEFAULT_ACTIVITIES = [
+    "Take a short walk",  # show timer
+    "Do some deep breathing exercises",  # breathing
+    "Perform desk exercises",  # show sketches of exercises
+    "Get a glass of water",  # show a water glass and keep track of glasses
+    "Look at something 20 feet away for 20 seconds",  # show timer
+]
+
+# Activity recorded for a break the user took by leaving the desk
+AWAY_ACTIVITY = "Away from desk"
+
+
+class Phase(Enum):
+    IDLE = "Idle"
+    WORK = "Work"
+    BREAK_PENDING = "Break pending"
+    BREAK = "Break"
+
+
+@dataclass(frozen=True)
+class Transition:
+    """A change of phase, `at` is the clock time the new phase started.
+
+    `elapsed` is how long the previous phase lasted and `completed` whether
+    it ran until its deadline rather than being cut short.
+    """
+
+    previous: Phase
+    phase: Phase
+    at: float
+    activity: str = None
+    previous_activity: str = None
+    elapsed: float = 0.0
+    completed: bool = False
+
+
+class BreakEngine:
+    """Owns the work/break phase, its deadline and the activity rotation.
+
+    Work ends in a short BREAK_PENDING phase before the break itself, which
+    already carries the break's activity so it can be prepared, and a
+    finished break returns to IDLE. Deadlines are chained from the previous
+    deadline rather than from when `poll` notices them, so a clock that jumps
+    forward (a resumed laptop, a virtual clock) replays every missed
+    transition exactly.
+    """
+
+    def __init__(
+        self,
+        work_duration: int = 1500,
+        break_duration: int = 300,
+        break_delay: float = 3,
+        activities: list[str] = None,
+        clock: Callable[[], float] = monotonic,
+        rng: random.Random = None,
+    ):
+        self.work_duration = work_duration
+        self.break_duration = break_duration
+        self.break_delay = break_delay
+        self.set_activities(DEFAULT_ACTIVITIES if activities is None else activities)
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self.phase = Phase.IDLE
+        self.activity = None
+        self._phase_activity = None
+        self.timer = PhaseTimer(clock)
+        self._listeners: list[Callable[[Transition], None]] = []
+
+    @property
+    def is_active(self) -> bool:
+        return self.phase in (Phase.WORK, Phase.BREAK)
+
+    @property
+    def is_working(self) -> bool:
+        return self.phase is Phase.WORK
+
+    def set_activities(
+        self,
+        activities: list[str],
+        weights: dict[str, float] = None,
+        durations: dict[str, float] = None,
+    ):
+        """Replace the activity rotation.
+
+        `weights` make an activity more likely to come early in each round
+        and `durations` override the break duration for an activity.
+        """
+        self.activities = list(activities)
+        self.weights = weights or {}
+        self.durations = durations or {}
+        self.remaining_activities = self.activities.copy()
+
+    def subscribe(self, listener: Callable[[Transition], None]):
+        """Call `listener` with every Transition from now on."""
+        self._listeners.append(listener)
+
+    def remaining(self) -> float:
+        return self.timer.remaining()
+
+    def progress(self) -> float:
+        return self.timer.progress()
+
+    def next_deadline(self) -> float | None:
+        """Clock time of the next automatic transition, if any."""
+        if self.timer.is_paused:
+            return None
+        return self.timer.deadline
+
+    def user_away(self, since: float):
+        """Pause a running work phase from `since`, when the user left."""
+        if self.phase is Phase.WORK:
+            # Idle time can reach back to before this work phase started
+            self.timer.pause(max(since, self.timer.started_at))
+
+    def user_back(self, at: float = None) -> list[Transition]:
+        """Continue after the user returns at `at`.
+
+        An absence during work at least as long as a break is recorded as a
+        break taken from when work was paused, and work starts over; a
+        shorter one just pauses the work timer. Returns the transitions this
+        caused.
+        """
+        at = self.clock() if at is None else at
+        if self.phase is not Phase.WORK or not self.timer.is_paused:
+            return []
+
+        away_since = self.timer.paused_at
+        if at - away_since < self.break_duration:
+            self.timer.resume(at)
+            return []
+        logging.info("Away for %.0f seconds, counting it as a break", at - away_since)
+        self.activity = AWAY_ACTIVITY
+        return [
+            self._enter(Phase.BREAK, self.break_duration, away_since),
+            self.start_work(at),
+        ]
+
+    def start_work(self, at: float = None):
+        self.activity = None
+        return self._enter(Phase.WORK, self.work_duration, at)
+
+    def start_break(self, at: float = None):
+        # A pending break already chose its activity so it could be prepared
+        if self.phase is not Phase.BREAK_PENDING or self.activity is None:
+            self.activity = self.select_activity()
+        duration = self.durations.get(self.activity, self.break_duration)
+        return self._enter(Phase.BREAK, duration, at)
+
+    def stop(self, at: float = None):
+        self.activity = None
+        return self._enter(Phase.IDLE, None, at)
+
+    def poll(self) -> list[Transition]:
+        """Apply every transition whose deadline has passed."""
+        transitions = []
+        while self.timer.expired():
+            deadline = self.timer.deadline
+            if self.phase is Phase.WORK:
+                self.activity = self.select_activity()
+                transition = self._enter(
+                    Phase.BREAK_PENDING, self.break_delay, deadline
+                )
+            elif self.phase is Phase.BREAK_PENDING:
+                transition = self.start_break(at=deadline)
+            else:
+                transition = self.stop(at=deadline)
+            transitions.append(transition)
+        return transitions
+
+    def select_activity(self) -> str:
+        """Pick a random activity, showing each one before any repeats."""
+        if not self.activities:
+            return None
+        if not self.remaining_activities:
+            self.remaining_activities = self.activities.copy()
+            logging.info("All activities have been shown. Resetting the list.")
+
+        weights = [self.weights.get(a, 1.0) for a in self.remaining_activities]
+        if self.weights and sum(weights) > 0:
+            activity = self.rng.choices(self.remaining_activities, weights)[0]
+        else:
+            activity = self.rng.choice(self.remaining_activities)
+        self.remaining_activities.remove(activity)
+        logging.debug("Selected activity: %s", activity)
+        logging.debug("Remaining activities: %s", self.remaining_activities)
+        return activity
+
+    def _enter(self, phase: Phase, duration: float | None, at: float | None):
+        at = self.clock() if at is None else at
+        timer = self.timer
+        elapsed = 0.0 if timer.started_at is None else at - timer.started_at
+        completed = timer.deadline is not None and at >= timer.deadline
+        if duration is None:
+            timer.stop()
+        else:
+            timer.start(duration, started_at=at)
+
+        transition = Transition(
+            self.phase,
+            phase,
+            at,
+            activity=self.activity,
+            previous_activity=self._phase_activity,
+            elapsed=elapsed,
+            completed=completed,
+        )
+        self.phase = phase
+        self._phase_activity = self.activity
+        for listener in list(self._listeners):
+            listener(transition)
+        return transition
@@ -0,0 +1,159 @@
+"""Qt-free detection of the user being away from the machine.
+
+Backends report how long it has been since the last keyboard or mouse
+input. IdleMonitor turns that into away/back events and tells its caller
+when the next check is worth doing, so an unattended machine is polled
+less and less often.
+"""
+import ctypes.util
+import logging
+import os
+import sys
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Callable
+
+from engine import monotonic
+
+
+class IdleBackend(ABC):
+    """Reports the seconds since the last user input, or None if unknown."""
+
+    @abstractmethod
+    def idle_seconds(self) -> float | None: ...
+
+
+class FakeIdleBackend(IdleBackend):
+    """Backend whose idle time is set by hand, for tests and simulations."""
+
+    def __init__(self, idle: float = 0.0):
+        self.idle = idle
+
+    def idle_seconds(self) -> float | None:
+        return self.idle
+
+
+class _XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("eventMask", ctypes.c_ulong),
+    ]
+
+
+class X11IdleBackend(IdleBackend):
+    """Idle time from the X11 MIT-SCREEN-SAVER extension (libXss)."""
+
+    def __init__(self, display: str = None):
+        xlib_name = ctypes.util.find_library("X11")
+        xss_name = ctypes.util.find_library("Xss")
+        if xlib_name is None or xss_name is None:
+            raise OSError("libX11 or libXss is not available")
+        self._xlib = ctypes.CDLL(xlib_name)
+        self._xss = ctypes.CDLL(xss_name)
+
+        self._xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self._xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self._xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+        self._xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.POINTER(_XScreenSaverInfo),
+        ]
+
+        self._display = self._xlib.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError("Unable to open X display")
+        self._root = self._xlib.XDefaultRootWindow(self._display)
+        self._info = self._xss.XScreenSaverAllocInfo()
+
+    def idle_seconds(self) -> float | None:
+        if not self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info):
+            return None
+        return self._info.contents.idle / 1000
+
+
+def default_idle_backend() -> IdleBackend | None:
+    """Return the idle backend for this platform, or None if there is none."""
+    wayland = os.environ.get("WAYLAND_DISPLAY") or (
+        os.environ.get("XDG_SESSION_TYPE") == "wayland"
+    )
+    if wayland:
+        # XWayland only sees input sent to X clients, typing in a native
+        # Wayland window would look like the user being away
+        logging.info("Idle detection unavailable in Wayland sessions")
+        return None
+    if sys.platform.startswith("linux") and os.environ.get("DISPLAY"):
+        try:
+            return X11IdleBackend()
+        except OSError as e:
+            logging.info("Idle detection unavailable: %s", e)
+    return None
+
+
+class IdleMonitor:
+    """Turns backend idle times into away/back events with adaptive polling.
+
+    While the user is active there is no point checking again before the
+    idle time could reach the threshold. While away, the interval doubles
+    from `min_interval` up to `max_interval`. The away and return times are
+    derived from the reported idle time, so they are exact however late a
+    poll happens.
+    """
+
+    def __init__(
+        self,
+        backend: IdleBackend,
+        threshold: float = 300,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        on_away: Callable[[float], None] = None,
+        on_back: Callable[[float, float], None] = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.backend = backend
+        self.threshold = threshold
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_away = on_away
+        self.on_back = on_back
+        self._clock = clock
+        self.away_since = None
+        self._backoff = min_interval
+
+    @property
+    def is_away(self) -> bool:
+        return self.away_since is not None
+
+    def poll(self) -> float:
+        """Check the backend and return the seconds until the next poll."""
+        idle = self.backend.idle_seconds()
+        if idle is None:
+            return self.max_interval
+        now = self._clock()
+
+        if self.away_since is None:
+            if idle < self.threshold:
+                return max(self.min_interval, self.threshold - idle)
+            self.away_since = now - idle
+            self._backoff = self.min_interval
+            logging.info("User away for %.0f seconds", idle)
+            if self.on_away is not None:
+                self.on_away(self.away_since)
+        elif idle < now - self.away_since - 1:
+            # There has been input since the user went away
+            away_since, self.away_since = self.away_since, None
+            returned_at = now - idle
+            logging.info("User back after %.0f seconds", returned_at - away_since)
+            if self.on_back is not None:
+                self.on_back(away_since, returned_at)
+            return max(self.min_interval, self.threshold - idle)
+
+        interval = self._backoff
+        self._backoff = min(self.max_interval, self._backoff * 2)
+        return interval
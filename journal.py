@@ -0,0 +1,288 @@
+"""Crash-safe, append-only journal of work and break sessions.
+
+Every finished work or break session is appended to a JSON Lines file by a
+background writer thread, which fsyncs each batch. Daily and weekly rollups
+are updated as events are written and snapshotted next to the journal
+together with the byte offset they cover, so loading them only replays the
+events appended since the last snapshot.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from datetime import date
+from datetime import datetime
+from pathlib import Path
+
+from engine import monotonic
+from engine import Phase
+from engine import Transition
+
+JOURNAL_DIR = Path.home() / ".local" / "share" / "active_breaks"
+
+# Phases that are recorded as sessions when they end
+SESSION_TYPES = {Phase.WORK: "work", Phase.BREAK: "break"}
+
+
+def empty_rollup() -> dict:
+    return {
+        "work_sessions": 0,
+        "work_completed": 0,
+        "work_seconds": 0.0,
+        "breaks": 0,
+        "breaks_skipped": 0,
+        "break_seconds": 0.0,
+        "interrupted": 0,
+        "glasses": 0,
+        "activities": {},
+    }
+
+
+def merge_rollup(total: dict, rollup: dict):
+    """Add the counts of `rollup` into `total`."""
+    for key, value in rollup.items():
+        if key == "activities":
+            for activity, count in value.items():
+                total[key][activity] = total[key].get(activity, 0) + count
+        else:
+            total[key] += value
+
+
+def week_key(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SessionJournal:
+    """Append-only session journal with incrementally maintained rollups."""
+
+    def __init__(
+        self,
+        directory: Path = JOURNAL_DIR,
+        flush_interval: float = 2.0,
+        snapshot_interval: float = 60.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.path = Path(directory) / "journal.jsonl"
+        self.rollup_path = Path(directory) / "rollups.json"
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self._clock = clock
+
+        self.daily: dict[str, dict] = {}
+        self.weekly: dict[str, dict] = {}
+        self._offset = 0
+        self._open_session = None
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._last_snapshot = time.monotonic()
+        self._load()
+
+    def start(self):
+        """Start the background writer thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write_loop, name="session-journal", daemon=True
+            )
+            self._thread.start()
+
+    def close(self):
+        """Write out everything queued so far and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def record(self, event: dict):
+        """Queue an event to be appended to the journal."""
+        event.setdefault("time", time.time())
+        self._queue.put(event)
+
+    def record_transition(self, transition: Transition, **details):
+        """Journal the session a transition started or finished."""
+        # Transitions carry monotonic times, which can lag the wall clock
+        # when several deadlines are replayed at once after a suspend
+        wall_time = time.time() - (self._clock() - transition.at)
+
+        session_type = SESSION_TYPES.get(transition.previous)
+        if session_type is not None:
+            event = {
+                "type": session_type,
+                "time": wall_time,
+                "seconds": round(transition.elapsed, 3),
+                "completed": transition.completed,
+            }
+            if transition.previous_activity is not None:
+                event["activity"] = transition.previous_activity
+            event.update(details)
+            self.record(event)
+
+        session_type = SESSION_TYPES.get(transition.phase)
+        if session_type is not None:
+            self.record({"type": f"{session_type}_started", "time": wall_time})
+
+    def stats(self, start: date, end: date) -> dict:
+        """Totals for the days from `start` to `end`, both included."""
+        total = empty_rollup()
+        first, last = start.isoformat(), end.isoformat()
+        with self._lock:
+            for day, rollup in self.daily.items():
+                if first <= day <= last:
+                    merge_rollup(total, rollup)
+        return total
+
+    def week_stats(self, day: date) -> dict:
+        """Totals for the ISO week containing `day`."""
+        total = empty_rollup()
+        with self._lock:
+            rollup = self.weekly.get(week_key(day))
+            if rollup is not None:
+                merge_rollup(total, rollup)
+        return total
+
+    def _load(self):
+        try:
+            snapshot = json.loads(self.rollup_path.read_text())
+            self._offset = snapshot["offset"]
+            self.daily = snapshot["daily"]
+            self.weekly = snapshot["weekly"]
+            self._open_session = snapshot.get("open_session")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._offset = 0
+            self.daily, self.weekly, self._open_session = {}, {}, None
+
+        try:
+            with open(self.path, "rb") as journal:
+                if journal.seek(0, os.SEEK_END) < self._offset:
+                    # The journal was replaced or truncated, rebuild everything
+                    self._offset = 0
+                    self.daily, self.weekly, self._open_session = {}, {}, None
+                journal.seek(self._offset)
+                data = journal.read()
+        except FileNotFoundError:
+            self._offset = 0
+            self.daily, self.weekly, self._open_session = {}, {}, None
+            return
+
+        # A crash can leave a partial last line; drop it so the next append
+        # starts on a fresh line
+        complete = data[: data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            logging.warning("Discarding truncated journal entry in %s", self.path)
+            os.truncate(self.path, self._offset + len(complete))
+
+        for line in complete.splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, AttributeError, KeyError, TypeError, OverflowError):
+                logging.warning("Skipping corrupt journal entry in %s", self.path)
+        self._offset += len(complete)
+
+        if self._open_session is not None:
+            # The app stopped without finishing this session
+            self.record({"type": "interrupted", "session": self._open_session})
+
+    def _apply(self, event: dict):
+        """Update the rollups with one journal event.
+
+        Every field is read before anything is counted, so an event that
+        raises leaves the rollups as they were.
+        """
+        event_type = event.get("type")
+        if event_type in ("work_started", "break_started"):
+            self._open_session = event_type.removesuffix("_started")
+            return
+
+        day = datetime.fromtimestamp(event["time"]).date()
+        if event_type in ("work", "break"):
+            completed = int(bool(event["completed"]))
+            seconds = float(event["seconds"])
+            glasses = int(event.get("glasses", 0))
+            activity = event.get("activity")
+            if activity is not None and not isinstance(activity, str):
+                raise TypeError(f"Activity is not a string: {activity!r}")
+        rollups = [
+            self.daily.setdefault(day.isoformat(), empty_rollup()),
+            self.weekly.setdefault(week_key(day), empty_rollup()),
+        ]
+        for rollup in rollups:
+            if event_type == "work":
+                rollup["work_sessions"] += 1
+                rollup["work_completed"] += completed
+                rollup["work_seconds"] += seconds
+            elif event_type == "break":
+                rollup["breaks"] += 1
+                rollup["breaks_skipped"] += 1 - completed
+                rollup["break_seconds"] += seconds
+                rollup["glasses"] += glasses
+                if activity is not None:
+                    activities = rollup["activities"]
+                    activities[activity] = activities.get(activity, 0) + 1
+            elif event_type == "interrupted":
+                rollup["interrupted"] += 1
+        self._open_session = None
+
+    def _write_loop(self):
+        stopping = False
+        while not stopping:
+            events = [self._queue.get()]
+            # Batch everything that arrives within the flush interval
+            deadline = time.monotonic() + self.flush_interval
+            while events[-1] is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    events.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if events[-1] is None:
+                stopping = True
+                events.pop()
+
+            if events:
+                self._append(events)
+            since_snapshot = time.monotonic() - self._last_snapshot
+            if stopping or since_snapshot > self.snapshot_interval:
+                self._save_snapshot()
+
+    def _append(self, events: list[dict]):
+        data = "".join(json.dumps(event) + "\n" for event in events).encode()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as journal:
+                journal.write(data)
+                journal.flush()
+                os.fsync(journal.fileno())
+        except OSError:
+            logging.exception("Unable to write session journal %s", self.path)
+            return
+
+        with self._lock:
+            for event in events:
+                self._apply(event)
+            self._offset += len(data)
+
+    def _save_snapshot(self):
+        with self._lock:
+            snapshot = json.dumps(
+                {
+                    "offset": self._offset,
+                    "daily": self.daily,
+                    "weekly": self.weekly,
+                    "open_session": self._open_session,
+                }
+            )
+        tmp_path = self.rollup_path.with_suffix(".tmp")
+        try:
+            self.rollup_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as tmp:
+                tmp.write(snapshot)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.rollup_path)
+        except OSError:
+            logging.exception("Unable to save journal rollups %s", self.rollup_path)
+        self._last_snapshot = time.monotonic()
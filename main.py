@@ -1,18 +1,33 @@
+import atexit
+import gzip
+import json
 import logging
+import math
 import os
-import random
+import queue
+import shutil
 import sys
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date
 from enum import Enum
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-from PyQt6.QtCore import pyqtProperty
-from PyQt6.QtCore import QEasingCurve
-from PyQt6.QtCore import QPointF
-from PyQt6.QtCore import QPropertyAnimation
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import QFileSystemWatcher
+from PyQt6.QtCore import QObject
 from PyQt6.QtCore import QRectF
 from PyQt6.QtCore import QSettings
 from PyQt6.QtCore import Qt
 from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QVariantAnimation
+from PyQt6.QtGui import QActionGroup
 from PyQt6.QtGui import QBrush
 from PyQt6.QtGui import QColor
 from PyQt6.QtGui import QIcon
@@ -20,12 +35,16 @@ from PyQt6.QtGui import QKeyEvent
 from PyQt6.QtGui import QMouseEvent
 from PyQt6.QtGui import QPainter
 from PyQt6.QtGui import QPixmap
+from PyQt6.QtGui import QPixmapCache
 from PyQt6.QtGui import QScreen
+from PyQt6.QtNetwork import QLocalServer
+from PyQt6.QtNetwork import QLocalSocket
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import QDialog
 from PyQt6.QtWidgets import QHBoxLayout
 from PyQt6.QtWidgets import QLabel
 from PyQt6.QtWidgets import QMenu
+from PyQt6.QtWidgets import QMessageBox
 from PyQt6.QtWidgets import QPushButton
 from PyQt6.QtWidgets import QSizePolicy
 from PyQt6.QtWidgets import QSpinBox
@@ -33,29 +52,259 @@ from PyQt6.QtWidgets import QSystemTrayIcon
 from PyQt6.QtWidgets import QVBoxLayout
 from PyQt6.QtWidgets import QWidget
 
-
-def get_resource_path(relative_path):
-    """Get the path to a resource, works for dev and for PyInstaller"""
-    try:
-        # PyInstaller creates a temp folder and stores path in _MEIPASS
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
+import control
+from activities import ActivityRegistry
+from diagnostics import Diagnostics
+from engine import BreakEngine
+from engine import Phase
+from engine import Transition
+from idle import default_idle_backend
+from idle import IdleBackend
+from idle import IdleMonitor
+from journal import JOURNAL_DIR
+from journal import SessionJournal
+from memory import MemoryMonitor
+from memory import trim_heap
+from reminders import parse_reminders
+from reminders import ReminderScheduler
+from settings import LOG_LEVELS
+from settings import Settings
 
 
-# Set up logging
 log_dir = Path.home() / ".logs" / "active_breaks"
-log_dir.mkdir(parents=True, exist_ok=True)
 log_file = log_dir / "active_breaks.log"
+diagnostics_file = log_dir / "diagnostics.json"
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """Rotates the log when it grows too large or too old and gzips old logs.
+
+    The age is counted from when the current log was started, kept in a
+    `.started` file next to it, since appending on every run keeps the log's
+    modification time recent.
+    """
+
+    def __init__(
+        self,
+        filename,
+        max_bytes: int = 5 * 1024 * 1024,
+        backup_count: int = 5,
+        max_age: float = 7 * 24 * 3600,
+    ):
+        super().__init__(
+            filename,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8",
+            delay=True,
+        )
+        self.max_age = max_age
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+        self.stamp_path = self.baseFilename + ".started"
+        self._rollover_at = self._started_at() + max_age
+
+    def _started_at(self) -> float:
+        try:
+            with open(self.stamp_path, encoding="utf-8") as f:
+                return float(f.read())
+        except (OSError, ValueError):
+            pass
+        try:
+            # A log from before the stamp, its creation time if known
+            stat = os.stat(self.baseFilename)
+            started_at = getattr(stat, "st_birthtime", stat.st_mtime)
+        except OSError:
+            started_at = time.time()
+        self._write_stamp(started_at)
+        return started_at
+
+    def _write_stamp(self, started_at: float):
+        try:
+            with open(self.stamp_path, "w", encoding="utf-8") as f:
+                f.write(repr(started_at))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if time.time() >= self._rollover_at and os.path.exists(self.baseFilename):
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        started_at = time.time()
+        self._write_stamp(started_at)
+        self._rollover_at = started_at + self.max_age
+
+
+def setup_logging(level=logging.INFO):
+    """Send application logs to the log file through a background writer thread.
+
+    Records are only formatted once they pass the level check, and file I/O,
+    rotation and compression happen on the QueueListener thread.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    file_handler = CompressingRotatingFileHandler(log_file)
+    file_handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        )
+    )
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
 
-logging.basicConfig(
-    filename=str(log_file),
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+    queue_handler = QueueHandler(log_queue)
+    # The file handler formats the record, the queue only merges its arguments
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler])
+
+
+class SettingsService(QObject):
+    """Cached, typed view of the QSettings store.
+
+    `current` is read once and updated in memory; `changed` is emitted with
+    the new and old snapshots on every change. Bursts of updates are saved
+    together, `save_delay_ms` after the last one, by a single atomic write
+    on a background thread. Edits made to the settings file by anything else
+    are picked up through a file watcher. With a `path`, settings are kept
+    in that INI file instead of the platform's store.
+    """
+
+    changed = pyqtSignal(object, object)
+
+    def __init__(
+        self,
+        organization: str = "deskriders",
+        application: str = "activebreaks",
+        save_delay_ms: int = 500,
+        path: str = None,
+    ):
+        super().__init__()
+        self._names = (organization, application)
+        self._file = None if path is None else str(path)
+        self.path = self._store().fileName()
+        self.current = self._read()
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="settings-writer"
+        )
+        self._pending_save = None
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay_ms)
+        self._save_timer.timeout.connect(self.save)
+
+        # Editors write the file in several steps, reload once they are done
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(200)
+        self._reload_timer.timeout.connect(self.reload)
+
+        # Watch the directory too: an atomic save replaces the file, which
+        # drops the watch on it
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            logging.warning("Unable to create the directory of %s", self.path)
+        self._seen = self._identity()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._reload_timer.start)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watch()
+
+    def _identity(self) -> tuple | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _on_directory_changed(self):
+        # The directory can be shared with every other application's
+        # settings, as ~/Library/Preferences is, only our file matters
+        if self._identity() != self._seen:
+            self._reload_timer.start()
+
+    def _watch(self):
+        watched = self._watcher.files() + self._watcher.directories()
+        missing = [
+            path
+            for path in (self.path, str(Path(self.path).parent))
+            if os.path.exists(path) and path not in watched
+        ]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _store(self) -> QSettings:
+        if self._file is not None:
+            return QSettings(self._file, QSettings.Format.IniFormat)
+        return QSettings(*self._names)
+
+    def _read(self) -> Settings:
+        store = self._store()
+        store.sync()  # Pick up changes made by other processes
+        values = {key: store.value(key) for key in store.allKeys()}
+        return Settings.from_values(values)
+
+    def _write(self, settings: Settings):
+        # Runs on the writer thread with its own QSettings object, sync()
+        # replaces the file atomically
+        store = self._store()
+        for key, value in settings.to_values().items():
+            store.setValue(key, value)
+        store.sync()
+        if store.status() != QSettings.Status.NoError:
+            logging.error("Unable to save settings to %s", self.path)
+        else:
+            logging.debug("Settings saved to %s", self.path)
+
+    def update(self, **values):
+        """Change some settings, notify subscribers and schedule a save."""
+        settings = replace(self.current, **values)
+        if settings == self.current:
+            return
+        old, self.current = self.current, settings
+        self._save_timer.start()
+        logging.info("Settings changed: %s", sorted(settings.changed_fields(old)))
+        self.changed.emit(settings, old)
+
+    def save(self):
+        """Write the current snapshot on the writer thread."""
+        self._save_timer.stop()
+        self._pending_save = self._writer.submit(self._write, self.current)
+
+    def flush(self):
+        """Write any pending changes and wait until they are on disk."""
+        if self._save_timer.isActive():
+            self.save()
+        if self._pending_save is not None:
+            self._pending_save.result()
+
+    def reload(self):
+        """Re-read the settings file after it changed on disk."""
+        self._watch()
+        self._seen = self._identity()
+        if self._save_timer.isActive() or (
+            self._pending_save is not None and not self._pending_save.done()
+        ):
+            # Our own save is about to replace the file and trigger this again
+            return
+        settings = self._read()
+        if settings == self.current:
+            return
+        old, self.current = self.current, settings
+        logging.info("Settings reloaded from %s", self.path)
+        self.changed.emit(settings, old)
 
 
 class SettingsDialog(QDialog):
@@ -136,287 +385,38 @@ class SettingsDialog(QDialog):
         hold_duration = self.hold_spinbox.value() * 1000
         breath_duration = self.breath_spinbox.value() * 1000
         logging.debug(
-            f"Settings retrieved: Work duration: {work_duration}, Break duration: {break_duration}, Hold duration: {hold_duration}, Breath duration: {breath_duration}"
+            "Settings retrieved: Work duration: %s, Break duration: %s, "
+            "Hold duration: %s, Breath duration: %s",
+            work_duration,
+            break_duration,
+            hold_duration,
+            breath_duration,
         )
         return work_duration, break_duration, hold_duration, breath_duration
 
 
-class ImageSlideshow(QWidget):
-    def __init__(self, image_paths, delay_ms=2000):
-        super().__init__()
-
-        self.image_paths = image_paths
-        self.delay_ms = delay_ms
-        self.current_index = 0
-
-        self.layout = QVBoxLayout()
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.layout.addWidget(self.image_label)
-        self.setLayout(self.layout)
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.show_next_image)
-        self.timer.start(self.delay_ms)
-
-        self.show_next_image()
-
-    def show_next_image(self):
-        if self.current_index >= len(self.image_paths):
-            self.current_index = 0
-
-        image_path = self.image_paths[self.current_index]
-        pixmap = QPixmap(image_path)
-        self.image_label.setPixmap(pixmap)
-        self.current_index += 1
-
-    def resizeEvent(self, event):
-        super().resizeEvent(event)
-
-
-class GlassWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.current_level = 0
-        self.max_levels = 5
-        self.setFixedSize(200, 200)
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        glass_top_width = 140
-        glass_bottom_width = 100
-        glass_height = 150
-        glass_bottom_y = 10 + glass_height
-
-        top_left = QPointF(
-            (self.width() - glass_top_width) / 2, glass_bottom_y - glass_height
-        )
-        top_right = QPointF(
-            (self.width() + glass_top_width) / 2, glass_bottom_y - glass_height
-        )
-        bottom_left = QPointF((self.width() - glass_bottom_width) / 2, glass_bottom_y)
-        bottom_right = QPointF((self.width() + glass_bottom_width) / 2, glass_bottom_y)
-
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(Qt.BrushStyle.NoBrush)
-
-        painter.drawPolygon([top_left, top_right, bottom_right, bottom_left])
-
-        level_height = glass_height / self.max_levels
-        water_color = QColor(0, 128, 255, 200)
-
-        for i in range(self.current_level):
-            bottom_level_y = glass_bottom_y - i * level_height
-            top_level_y = bottom_level_y - level_height + 5
-
-            current_bottom_width = glass_bottom_width + (
-                i * (glass_top_width - glass_bottom_width) / self.max_levels
-            )
-            current_top_width = glass_bottom_width + (
-                (i + 1) * (glass_top_width - glass_bottom_width) / self.max_levels
-            )
-
-            bottom_left_level = QPointF(
-                (self.width() - current_bottom_width) / 2, bottom_level_y
-            )
-            bottom_right_level = QPointF(
-                (self.width() + current_bottom_width) / 2, bottom_level_y
-            )
-            top_left_level = QPointF(
-                (self.width() - current_top_width) / 2, top_level_y
-            )
-            top_right_level = QPointF(
-                (self.width() + current_top_width) / 2, top_level_y
-            )
-
-            painter.setBrush(QBrush(water_color))
-            painter.setPen(Qt.PenStyle.NoPen)
-
-            painter.drawPolygon(
-                [top_left_level, top_right_level, bottom_right_level, bottom_left_level]
-            )
-
-
-class DrinkingGlassWidget(QWidget):
-    def __init__(self):
-        super().__init__()
-
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 10)
-        self.glass_widget = GlassWidget()
-
-        button_layout = QHBoxLayout()
-
-        common_button_style = """
-            QPushButton {
-                background-color: #f0f0f0;
-                border: 1px solid #c0c0c0;
-                border-radius: 5px;
-                padding: 5px;
-                color: black;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:pressed {
-                background-color: #d0d0d0;
-            }
-        """
-
-        self.plus_button = QPushButton("+")
-        self.plus_button.setFixedSize(40, 40)
-        self.plus_button.clicked.connect(self.increase_level)
-        self.plus_button.setStyleSheet(
-            common_button_style
-            + """
-            QPushButton {
-                font-size: 14px;
-            }
-        """
-        )
-
-        self.reset_button = QPushButton("Reset")
-        self.reset_button.setFixedSize(60, 40)
-        self.reset_button.clicked.connect(self.reset_level)
-        self.reset_button.setStyleSheet(
-            common_button_style
-            + """
-            QPushButton {
-                font-size: 10px;
-            }
-        """
-        )
-
-        button_layout.addWidget(self.plus_button)
-        button_layout.addWidget(self.reset_button)
-
-        layout.addWidget(self.glass_widget)
-        layout.addLayout(button_layout)
-
-        self.setLayout(layout)
-
-    def increase_level(self):
-        if self.glass_widget.current_level < self.glass_widget.max_levels:
-            self.glass_widget.current_level += 1
-            self.glass_widget.update()
-
-    def reset_level(self):
-        self.glass_widget.current_level = 0
-        self.glass_widget.update()
-
-
-class BreathState(Enum):
-    INHALE = "Inhale"
-    EXHALE = "Exhale"
-    HOLD = "Hold"
-
-
-class BreathingWidget(QWidget):
-    def __init__(self, parent=None, **kwargs):
-        super().__init__(parent)
-        self._breathe_progress = 0
-
-        # Default values
-        self.min_size = kwargs.get("min_size", 10)
-        self.max_size = kwargs.get("max_size", 200)
-        self.hold_time = kwargs.get("hold_time", 5000)
-        self.breath_time = kwargs.get("breath_time", 7000)
-        self.circle_color = kwargs.get("circle_color", QColor(200, 200, 255))
-        self.text_color = kwargs.get("text_color", QColor(0, 0, 0))
-
-        self._dot_size = self.min_size
-        self.state = BreathState.INHALE
-
-        self.setMinimumSize(self.max_size, self.max_size)
-
-        self.label = QLabel(self.state.value, alignment=Qt.AlignmentFlag.AlignCenter)
-        self.label.setStyleSheet(f"color: {self.text_color.name()}")
-
-        layout = QVBoxLayout()
-        layout.addWidget(self.label)
-        self.setLayout(layout)
-
-        self.animation = QPropertyAnimation(self, b"dot_size")
-        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
-        self.animation.setDuration(self.breath_time)
-        self.animation.valueChanged.connect(self.update)
-        self.animation.finished.connect(self.on_animation_finished)
-
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        self.setStyleSheet("background:transparent;")
-
-        self.start_inhale()
-
-    def start_inhale(self):
-        self.state = BreathState.INHALE
-        self.label.setText(self.state.value)
-        self.animation.setStartValue(self.min_size)
-        self.animation.setEndValue(self.max_size)
-        self.animation.start()
-
-    def start_exhale(self):
-        self.state = BreathState.EXHALE
-        self.label.setText(self.state.value)
-        self.animation.setStartValue(self.max_size)
-        self.animation.setEndValue(self.min_size)
-        self.animation.start()
-
-    def start(self):
-        """Start the breathing animation."""
-        self.animation.start()
-
-    def stop(self):
-        """Stop the breathing animation."""
-        self.animation.stop()
-        self.breathe_progress = 0
-        self.update()
-
-    def on_animation_finished(self):
-        self.state = BreathState.HOLD
-        self.label.setText(self.state.value)
-        if self.state == BreathState.HOLD:
-            if self._dot_size == self.max_size:
-                QTimer.singleShot(self.hold_time, self.start_exhale)
-            else:
-                QTimer.singleShot(self.hold_time, self.start_inhale)
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(self.circle_color)
-
-        center = self.rect().center()
-        center.setY(center.y())  # Move circle up to make room for text
-        painter.drawEllipse(center, self._dot_size // 2, self._dot_size // 2)
-
-    def get_dot_size(self):
-        return self._dot_size
-
-    def set_dot_size(self, size):
-        if self._dot_size != size:
-            self._dot_size = size
-            self.update()
-
-    @pyqtProperty(float)
-    def breathe_progress(self):
-        return self._breathe_progress
-
-    @breathe_progress.setter
-    def breathe_progress(self, value):
-        self._breathe_progress = value
-        self.update()  # Trigger a repaint when the progress changes
-
-    dot_size = pyqtProperty(int, get_dot_size, set_dot_size)
+class BlockerMode(Enum):
+    # Paint a translucent fill into a transparent window
+    TRANSLUCENT = "translucent"
+    # Dim the whole window with setWindowOpacity and a stylesheet background
+    WINDOW_OPACITY = "window_opacity"
 
 
 class FullScreenBlocker(QWidget):
     """Full screen translucent blocker window that prevents interaction during breaks."""
 
-    def __init__(self, screen: QScreen, parent=None):
+    OPACITY = 0.7
+    FADE_STEPS = 32
+
+    # Fill brushes by fade step, shared by the blockers of every screen
+    _brushes: dict[int, QBrush] = {}
+
+    def __init__(
+        self,
+        screen: QScreen,
+        mode: BlockerMode = BlockerMode.TRANSLUCENT,
+        parent=None,
+    ):
         super().__init__(
             parent,
             Qt.WindowType.FramelessWindowHint
@@ -425,10 +425,17 @@ class FullScreenBlocker(QWidget):
         )
         logging.debug("Initializing FullScreenBlocker")
         self._screen = screen
+        self.mode = mode
+        self._fade_step = self.FADE_STEPS
 
-        # Make the window translucent with a dark background
-        self.setWindowOpacity(0.7)
-        self.setStyleSheet("background-color: black;")
+        if mode is BlockerMode.TRANSLUCENT:
+            # A transparent window with one translucent fill, no stylesheet
+            # to resolve and no window-wide opacity for the compositor
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        else:
+            # Make the window translucent with a dark background
+            self.setWindowOpacity(self.OPACITY)
+            self.setStyleSheet("background-color: black;")
 
         self.setAttribute(Qt.WidgetAttribute.WA_MacAlwaysShowToolWindow, True)
         self.update_geometry()
@@ -443,6 +450,39 @@ class FullScreenBlocker(QWidget):
             return
         self.setGeometry(self._screen.geometry())
 
+    @classmethod
+    def fill_brush(cls, step: int) -> QBrush:
+        brush = cls._brushes.get(step)
+        if brush is None:
+            alpha = round(255 * cls.OPACITY * step / cls.FADE_STEPS)
+            brush = cls._brushes[step] = QBrush(QColor(0, 0, 0, alpha))
+        return brush
+
+    def set_fade(self, fade: float):
+        """Set how far the blocker has faded in, from 0 to 1."""
+        step = round(max(0.0, min(1.0, fade)) * self.FADE_STEPS)
+        if step == self._fade_step:
+            return
+        self._fade_step = step
+        if self.mode is BlockerMode.TRANSLUCENT:
+            self.update()
+        else:
+            self.setWindowOpacity(self.OPACITY * step / self.FADE_STEPS)
+
+    def paintEvent(self, event):
+        if self.mode is not BlockerMode.TRANSLUCENT:
+            super().paintEvent(event)
+            return
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(event.rect(), self.fill_brush(self._fade_step))
+
+    def prepare(self):
+        """Lay out, polish and create the native window ahead of showing it."""
+        self.update_geometry()
+        self.ensurePolished()
+        self.winId()
+
     def show_blocker(self):
         self.update_geometry()
         self.show()
@@ -459,10 +499,26 @@ class FullScreenBlocker(QWidget):
 
 
 class MultiScreenBlocker:
-    def __init__(self):
+    """One blocker per screen, shown and faded in together.
+
+    With `fade_in_ms` set, a single animation drives the fade of every
+    screen's blocker.
+    """
+
+    def __init__(
+        self, mode: BlockerMode = BlockerMode.TRANSLUCENT, fade_in_ms: int = 0
+    ):
         self._app = QApplication.instance()
         self._blockers: dict[QScreen, FullScreenBlocker] = {}
+        self._geometry_slots: dict[QScreen, Callable] = {}
         self._is_visible = False
+        self.mode = mode
+        self.fade_in_ms = fade_in_ms
+
+        self._fade = QVariantAnimation()
+        self._fade.setStartValue(0.0)
+        self._fade.setEndValue(1.0)
+        self._fade.valueChanged.connect(self._set_fade)
 
         self._sync_screens()
         self._app.screenAdded.connect(self._on_screen_added)
@@ -478,23 +534,30 @@ class MultiScreenBlocker:
                 self._remove_screen(screen)
 
     def _add_screen(self, screen: QScreen):
-        blocker = FullScreenBlocker(screen=screen)
+        blocker = FullScreenBlocker(screen=screen, mode=self.mode)
         blocker.hide()
         self._blockers[screen] = blocker
 
-        screen.geometryChanged.connect(
+        slot = self._geometry_slots[screen] = (
             lambda _geometry, s=screen: self._on_screen_geometry_changed(s)
         )
+        screen.geometryChanged.connect(slot)
 
         if self._is_visible:
+            running = self._fade.state() == QVariantAnimation.State.Running
+            blocker.set_fade(self._fade.currentValue() if running else 1.0)
             blocker.show_blocker()
 
     def _remove_screen(self, screen: QScreen):
         blocker = self._blockers.pop(screen, None)
         if blocker is None:
             return
+        slot = self._geometry_slots.pop(screen, None)
+        if slot is not None:
+            screen.geometryChanged.disconnect(slot)
         blocker.hide()
         blocker.close()
+        blocker.deleteLater()
 
     def _on_screen_added(self, screen: QScreen):
         self._add_screen(screen)
@@ -508,20 +571,65 @@ class MultiScreenBlocker:
             return
         blocker.update_geometry()
 
+    def prepare(self):
+        """Create and lay out a blocker for every screen ahead of `show`."""
+        self._sync_screens()
+        for blocker in self._blockers.values():
+            blocker.prepare()
+
+    def _set_fade(self, fade: float):
+        for blocker in self._blockers.values():
+            blocker.set_fade(fade)
+
     def show(self):
         self._sync_screens()
         self._is_visible = True
+        self._set_fade(0.0 if self.fade_in_ms > 0 else 1.0)
+        # Map every blocker before raising any, so all screens go dark together
         for blocker in self._blockers.values():
-            blocker.show_blocker()
+            blocker.update_geometry()
+            blocker.show()
+        for blocker in self._blockers.values():
+            blocker.raise_()
+            blocker.activateWindow()
+        if self.fade_in_ms > 0:
+            self._fade.setDuration(self.fade_in_ms)
+            self._fade.start()
 
     def hide(self):
         self._is_visible = False
+        self._fade.stop()
         for blocker in self._blockers.values():
             blocker.hide()
 
+    def close(self):
+        """Destroy every blocker window; the object is unusable afterwards."""
+        self.hide()
+        self._app.screenAdded.disconnect(self._on_screen_added)
+        self._app.screenRemoved.disconnect(self._on_screen_removed)
+        for screen in list(self._blockers):
+            self._remove_screen(screen)
+
 
 class BreakActivityWindow(QWidget):
-    def __init__(self, hold_duration: int, breath_duration: int, parent=None):
+    """Floating window showing the current break activity.
+
+    Activity widgets come from the activity registry and are only built,
+    and their modules imported, when `set_activity` selects them. They are
+    released when the break ends, unless `keep_warm` asks to keep them around;
+    kept widgets with a `reset` method are reset for the next break.
+    """
+
+    def __init__(
+        self,
+        hold_duration: int,
+        breath_duration: int,
+        breathing_fps: int = 30,
+        low_power: bool = False,
+        keep_warm: bool = False,
+        registry: ActivityRegistry = None,
+        parent=None,
+    ):
         super().__init__(
             parent,
             Qt.WindowType.FramelessWindowHint
@@ -572,65 +680,70 @@ class BreakActivityWindow(QWidget):
         self.activity_label.setStyleSheet("font-size: 16px; padding: 10px")
         main_layout.addWidget(self.activity_label)
 
-        # Add BreathingWidget
-        self.breathing_widget = BreathingWidget(
-            self, hold_time=hold_duration, breath_time=breath_duration
-        )
-        main_layout.addWidget(self.breathing_widget)
-        self.breathing_widget.hide()
-
-        # Add DrinkingGlassWidget
-        self.glass_widget = DrinkingGlassWidget()
-        main_layout.addWidget(self.glass_widget)
-        self.glass_widget.hide()
-
-        # Add ImageSlideshow
-        self.image_slideshow = ImageSlideshow(
-            [
-                get_resource_path(f)
-                for f in [
-                    "exercises/exercise-1.png",
-                    "exercises/exercise-2.png",
-                    "exercises/exercise-3.png",
-                    "exercises/exercise-4.png",
-                    "exercises/exercise-5.png",
-                    "exercises/exercise-6.png",
-                    "exercises/exercise-7.png",
-                    "exercises/exercise-8.png",
-                    "exercises/exercise-9.png",
-                    "exercises/exercise-10.png",
-                    "exercises/exercise-11.png",
-                    "exercises/exercise-12.png",
-                ]
-            ],
-            delay_ms=10000,
-        )
-        main_layout.addWidget(self.image_slideshow)
-        self.image_slideshow.hide()
+        self.hold_duration = hold_duration
+        self.breath_duration = breath_duration
+        self.breathing_fps = breathing_fps
+        self.low_power = low_power
+        self.keep_warm = keep_warm
+        self.main_layout = main_layout
+        self.registry = ActivityRegistry() if registry is None else registry
+        self._activity_widgets: dict[str, QWidget] = {}
+        self.activity = None
 
         self.setLayout(main_layout)
         logging.debug("BreakActivityWindow initialized")
 
-    def start_breathing_exercise(self):
-        self.breathing_widget.show()
-        self.breathing_widget.start()
-
-    def stop_breathing_exercise(self):
-        self.breathing_widget.hide()
-        self.breathing_widget.stop()
+    def activity_widget(self, activity):
+        """Return the widget for an activity, building it on first use."""
+        widget = self._activity_widgets.get(activity)
+        if widget is None:
+            factory = self.registry.widget_factory(activity)
+            if factory is None:
+                return None
+            logging.debug("Creating widget for activity: %s", activity)
+            widget = factory(self)
+            widget.hide()
+            self.main_layout.addWidget(widget)
+            self._activity_widgets[activity] = widget
+        return widget
 
     def set_activity(self, activity):
         """Set the activity text and adjust the window size."""
-        logging.debug(f"Setting break activity: {activity}")
-        if activity == "Do some deep breathing exercises":
-            self.start_breathing_exercise()
-        elif activity == "Get a glass of water":
-            self.glass_widget.show()
-        elif activity == "Perform desk exercises":
-            self.image_slideshow.show()
+        logging.debug("Setting break activity: %s", activity)
+        self.activity = activity
+        for other_activity, widget in self._activity_widgets.items():
+            if other_activity != activity:
+                widget.hide()
+
+        # Animated widgets start once they are actually visible on screen
+        widget = self.activity_widget(activity)
+        if widget is not None:
+            widget.show()
         self.activity_label.setText(activity)
         self.adjustSize()
 
+    def set_breath_timing(self, hold_duration: int, breath_duration: int):
+        """Apply new breathing durations, including to a built breathing widget."""
+        self.hold_duration = hold_duration
+        self.breath_duration = breath_duration
+        for widget in self._activity_widgets.values():
+            if hasattr(widget, "set_timing"):
+                widget.set_timing(hold_duration, breath_duration)
+
+    def set_breathing_frame_rate(self, max_fps: int, low_power: bool):
+        """Apply a new frame rate cap, including to a built breathing widget."""
+        self.breathing_fps = max_fps
+        self.low_power = low_power
+        for widget in self._activity_widgets.values():
+            if hasattr(widget, "set_frame_rate"):
+                widget.set_frame_rate(max_fps, low_power)
+
+    def prepare(self, activity):
+        """Build and lay out the window for `activity` without showing it."""
+        self.set_activity(activity)
+        self.ensurePolished()
+        self.winId()
+
     def mousePressEvent(self, event):
         """Enable dragging the window."""
         if event.button() == Qt.MouseButton.LeftButton:
@@ -655,104 +768,425 @@ class BreakActivityWindow(QWidget):
         else:
             super().keyPressEvent(event)
 
+    def glasses_drunk(self) -> int:
+        """Glasses tracked by the hydration widget during this break."""
+        return sum(
+            widget.glasses_drunk()
+            for widget in self._activity_widgets.values()
+            if hasattr(widget, "glasses_drunk")
+        )
+
     def hide_custom_widgets(self):
-        self.stop_breathing_exercise()
-        self.glass_widget.hide()
-        self.image_slideshow.hide()
+        """Hide the activity widgets and release them unless kept warm."""
+        self.activity = None
+        for activity, widget in list(self._activity_widgets.items()):
+            widget.hide()
+            if self.keep_warm:
+                # What one break tracked must not count again in the next
+                if hasattr(widget, "reset"):
+                    widget.reset()
+            else:
+                self.main_layout.removeWidget(widget)
+                widget.deleteLater()
+                del self._activity_widgets[activity]
+
+
+class ControlServer(QObject):
+    """Answers the JSON line requests of control.py on a local socket."""
+
+    def __init__(self, handler: Callable[[dict], dict], path: str = None):
+        super().__init__()
+        self.handler = handler
+        self.path = path or control.socket_path()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+
+    def listen(self) -> bool:
+        # With socket options set, listen() replaces any existing socket file,
+        # so a live instance has to be ruled out first
+        if control.is_listening(self.path):
+            logging.error("Another instance is listening on %s", self.path)
+            return False
+        # A socket left behind by an instance that crashed blocks listen()
+        QLocalServer.removeServer(self.path)
+        if not self.server.listen(self.path):
+            logging.error(
+                "Unable to listen on %s: %s", self.path, self.server.errorString()
+            )
+            return False
+        logging.info("Listening for commands on %s", self.path)
+        return True
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(
+                lambda connection=connection: self._on_ready_read(connection)
+            )
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _on_ready_read(self, connection: QLocalSocket):
+        while connection.canReadLine():
+            try:
+                request = json.loads(bytes(connection.readLine()))
+                response = self.handler(request)
+            except (ValueError, AttributeError):
+                response = {"ok": False, "error": "Invalid request"}
+            connection.write(json.dumps(response).encode() + b"\n")
+            connection.flush()
+
+
+class TrayIconRenderer:
+    """Renders tray icon frames once and caches them by their visible state."""
+
+    SIZE = 32
+    # Roughly one step per half pixel of arc at 32px, so a step change is visible
+    PROGRESS_STEPS = 200
+    CACHE_SIZE = 512
+
+    BACKGROUND_COLOR = QColor(200, 200, 200)
+    COLORS = {
+        "amber": QColor(255, 191, 0),
+        "blue": QColor(0, 120, 212),
+        "work": QColor(0, 120, 212),
+        "break": QColor(76, 175, 80),
+    }
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self._cache: OrderedDict[tuple, QIcon] = OrderedDict()
+        self._cache_size = cache_size
+        self.blank_icon = QIcon()
+
+    def frame_key(
+        self, is_working: bool, progress: float = 0, color: str = None
+    ) -> tuple:
+        """Return the cache key of the frame that would be visible for this state."""
+        phase = "work" if is_working else "break"
+        step = min(self.PROGRESS_STEPS, math.ceil(progress * self.PROGRESS_STEPS))
+        arc_color = phase if step > 0 else None
+        inner_color = color if color in ("amber", "blue") else phase
+        dpr = QApplication.instance().devicePixelRatio()
+        return arc_color, inner_color, max(step, 0), dpr
+
+    def icon(self, key: tuple) -> QIcon:
+        """Return the icon for a frame key, rendering it on first use."""
+        icon = self._cache.get(key)
+        if icon is not None:
+            self._cache.move_to_end(key)
+            return icon
+
+        icon = self._render(*key)
+        self._cache[key] = icon
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return icon
+
+    def cached_bytes(self) -> int:
+        return sum(round(self.SIZE * key[3]) ** 2 * 4 for key in self._cache)
+
+    def trim(self, max_bytes: int):
+        """Drop the least recently used icons until the rest fit in `max_bytes`."""
+        while self._cache and self.cached_bytes() > max_bytes:
+            self._cache.popitem(last=False)
+
+    def _render(self, arc_color, inner_color, step, dpr) -> QIcon:
+        size = self.SIZE
+        pixmap = QPixmap(round(size * dpr), round(size * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Draw background circle
+        painter.setBrush(self.BACKGROUND_COLOR)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawEllipse(QRectF(0, 0, size, size))
+
+        # Draw progress arc if there is progress
+        if arc_color is not None:
+            painter.setBrush(self.COLORS[arc_color])
+            start_angle = 90 * 16
+            span_angle = int(-step / self.PROGRESS_STEPS * 360 * 16)
+            painter.drawPie(0, 0, size, size, start_angle, span_angle)
+
+        # Draw inner circle
+        painter.setBrush(self.COLORS[inner_color])
+        painter.drawEllipse(QRectF(8, 8, 16, 16))
+
+        painter.end()
+        return QIcon(pixmap)
 
 
 class ActiveBreaksApp(QSystemTrayIcon):
-    """System Tray Application for managing active breaks."""
+    """System Tray Application for managing active breaks.
+
+    `journal_dir` and `settings_file` default to the user's journal and
+    settings; benchmarks point them elsewhere.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        fast_start: bool = False,
+        journal_dir: Path = JOURNAL_DIR,
+        settings_file: str = None,
+    ):
         super().__init__()
+        self.journal_dir = journal_dir
+        self.settings_file = settings_file
         logging.debug("Initializing ActiveBreaksApp")
 
-        self.setIcon(QIcon("assets/icon.ico"))
-
-        # Initialize settings
-        self.settings = QSettings("deskriders", "activebreaks")
-        self.work_duration = self.settings.value(
-            "work_duration", 1500, type=int
-        )  # 25 minutes
-        self.break_duration = self.settings.value(
-            "break_duration", 300, type=int
-        )  # 5 minutes
-        self.hold_duration = self.settings.value(
-            "hold_duration", 5000, type=int
-        )  # 5 seconds
-        self.breath_duration = self.settings.value(
-            "breath_duration", 7000, type=int
-        )  # 7 seconds
-        logging.debug(
-            f"Initial settings: Work duration: {self.work_duration}, Break duration: {self.break_duration}, Hold duration: {self.hold_duration}, Breath duration: {self.breath_duration}"
-        )
-
-        # Initialize timer
+        # The engine owns the phase state and its deadlines, this class only
+        # mirrors it in the tray and break windows
+        self.activities = ActivityRegistry()
+        self.engine = BreakEngine(activities=self.activities.names())
+        self.engine.subscribe(self.on_transition)
+        self._replaying = False
+
+        # Reminders that run alongside the work/break cycle, on its clock
+        self.reminders = ReminderScheduler(clock=self.engine.clock)
+
+        # Latency of the timer slots and a watchdog for handlers that stall
+        # the event loop, see the Diagnostics menu entry
+        self.diagnostics = Diagnostics()
+        self.diagnostics.start()
+        timed = self.diagnostics.timed
+        self._wakeup_due = None
+        self._tick_due = None
+
+        # Initialize timers: wakeup_timer wakes up once at the earliest engine
+        # or reminder deadline and timer only drives tooltip/icon refreshes
+        self.wakeup_timer = QTimer()
+        self.wakeup_timer.setSingleShot(True)
+        self.wakeup_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.wakeup_timer.timeout.connect(timed("on_wakeup", self.on_wakeup))
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_timer)
-        self.time_left = 0
-        self.is_working = False
-        self.is_active = False
-
-        # Initialize delay timer
-        self.delay_timer = QTimer()
-        self.delay_timer.setSingleShot(True)
-        self.delay_timer.timeout.connect(self.start_break)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(timed("update_timer", self.on_tick))
 
         # Initialize blink timer
         self.blink_timer = QTimer()
-        self.blink_timer.timeout.connect(self.blink_icon)
+        self.blink_timer.timeout.connect(timed("blink_icon", self.blink_icon))
         self.is_icon_visible = True
         self.blink_color = "amber"  # Can be "amber" or "blue"
 
+        # Initialize idle timer, it polls the idle monitor at the interval
+        # the monitor asks for
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.idle_timer.timeout.connect(timed("poll_idle", self.poll_idle))
+        self.idle_monitor = None
+
         # Create custom icon
-        self.icon_pixmap = QPixmap(32, 32)
-        self.setIcon(QIcon(self.icon_pixmap))
+        self.icon_renderer = TrayIconRenderer()
+
+        # Memory in use by phase and the caches behind it
+        self.memory = MemoryMonitor()
+        self._default_pixmap_cache_kb = QPixmapCache.cacheLimit()
+        self.memory.add_source("tray_icons", self.icon_renderer.cached_bytes)
+        self.memory.add_source("activity_widgets", self.activities.cached_bytes)
+        self._icon_key = None
+        self.update_icon()
         self.setVisible(True)
 
+        # Break activity window and full screen blocker are created on the
+        # first break, see the break_window and screen_blocker properties
+        self._break_window = None
+        self._screen_blocker = None
+        self.break_start_latency = None
+        self.journal = None
+        self.menu = None
+
+        # In fast-start mode the tray icon is shown first and the rest is
+        # initialised once the event loop is running. That rest now takes a
+        # few milliseconds, startup is mostly importing PyQt6
+        if fast_start:
+            QTimer.singleShot(0, self.finish_init)
+        else:
+            self.finish_init()
+
+    def finish_init(self):
+        """Load settings, build the menu and start the idle reminder."""
+        # Initialize settings, later changes are applied as they happen
+        self.settings = SettingsService(path=self.settings_file)
+        self.settings.changed.connect(self.apply_settings)
+        settings = self.settings.current
+        self.work_duration = settings.work_duration
+        self.break_duration = settings.break_duration
+        logging.getLogger().setLevel(settings.log_level)
+        logging.debug("Initial settings: %s", settings)
+        if settings.memory_budget > 0:
+            QPixmapCache.setCacheLimit(settings.memory_budget)
+
+        self.set_reminders(settings.reminders)
+
+        # Record finished sessions for statistics
+        self.journal = SessionJournal(self.journal_dir)
+        self.journal.start()
+
+        # Pause work and silence the tray while the user is away
+        backend = default_idle_backend()
+        if backend is not None:
+            self.start_idle_monitor(backend)
+
+        # Looking up entry points is slow, so plugins are loaded once the
+        # app is up rather than during startup
+        QTimer.singleShot(2000, self.load_activity_plugins)
+
         # Create the context menu
         self.menu = QMenu()
         self.work_action = self.menu.addAction("Start Work")
         self.break_action = self.menu.addAction("Start Break")
         self.menu.addSeparator()
+        self.statistics_action = self.menu.addAction("Statistics")
+        self.diagnostics_action = self.menu.addAction("Diagnostics")
         self.settings_action = self.menu.addAction("Settings")
+        self.log_level_menu = self.menu.addMenu("Log Level")
+        self.log_level_group = QActionGroup(self.log_level_menu)
+        for level in LOG_LEVELS:
+            action = self.log_level_menu.addAction(level.capitalize())
+            action.setData(level)
+            action.setCheckable(True)
+            action.setChecked(level == settings.log_level)
+            self.log_level_group.addAction(action)
         self.quit_action = self.menu.addAction("Quit")
 
         # Connect menu actions
-        self.work_action.triggered.connect(self.toggle_work)
-        self.break_action.triggered.connect(self.toggle_break)
+        timed = self.diagnostics.timed
+        self.work_action.triggered.connect(timed("toggle_work", self.toggle_work))
+        self.break_action.triggered.connect(timed("toggle_break", self.toggle_break))
+        # These measure their own work, not the time their dialogs are open
+        self.statistics_action.triggered.connect(self.show_statistics)
+        self.diagnostics_action.triggered.connect(self.show_diagnostics)
         self.settings_action.triggered.connect(self.show_settings)
+        self.log_level_group.triggered.connect(self.set_log_level)
         self.quit_action.triggered.connect(self.quit_app)
 
         # Set the context menu to the tray icon
         self.setContextMenu(self.menu)
 
-        # Initialize the icon
-        self.update_icon()
+        # Start amber blinking immediately as neither work nor break is active
+        self.start_blinking("amber")
 
-        # Initialize break activities
-        self.break_activities = [
-            "Take a short walk",  # show timer
-            "Do some deep breathing exercises",  # breathing
-            "Perform desk exercises",  # show sketches of exercises
-            "Get a glass of water",  # show a water glass and keep track of glasses
-            "Look at something 20 feet away for 20 seconds",  # show timer
-        ]
-        self.remaining_activities = self.break_activities.copy()
+        logging.info("ActiveBreaksApp initialized")
+
+    @property
+    def is_working(self) -> bool:
+        return self.engine.is_working
+
+    @property
+    def is_active(self) -> bool:
+        return self.engine.is_active
+
+    @property
+    def hold_duration(self) -> int:
+        return self.settings.current.hold_duration
+
+    @property
+    def breath_duration(self) -> int:
+        return self.settings.current.breath_duration
+
+    @property
+    def user_away(self) -> bool:
+        return self.idle_monitor is not None and self.idle_monitor.is_away
+
+    @property
+    def work_duration(self) -> int:
+        return self.engine.work_duration
+
+    @work_duration.setter
+    def work_duration(self, value: int):
+        self.engine.work_duration = value
+
+    @property
+    def break_duration(self) -> int:
+        return self.engine.break_duration
+
+    @break_duration.setter
+    def break_duration(self, value: int):
+        self.engine.break_duration = value
+
+    @property
+    def break_window(self) -> BreakActivityWindow:
+        if self._break_window is None:
+            self._break_window = BreakActivityWindow(
+                hold_duration=self.hold_duration,
+                breath_duration=self.breath_duration,
+                breathing_fps=self.settings.current.breathing_fps,
+                low_power=self.settings.current.low_power,
+                keep_warm=self.settings.current.keep_activity_widgets,
+                registry=self.activities,
+            )
+        return self._break_window
 
-        # Initialize break activity window
-        self.break_window = BreakActivityWindow(
-            hold_duration=self.hold_duration, breath_duration=self.breath_duration
+    @property
+    def screen_blocker(self) -> MultiScreenBlocker:
+        if self._screen_blocker is None:
+            self._screen_blocker = MultiScreenBlocker(
+                fade_in_ms=self.settings.current.blocker_fade_in
+            )
+        return self._screen_blocker
+
+    def load_activity_plugins(self):
+        """Add plugin activities to the registry and the engine's rotation."""
+        started = time.perf_counter()
+        self.activities.discover()
+        self.engine.set_activities(
+            self.activities.names(),
+            weights=self.activities.weights(),
+            durations=self.activities.durations(),
+        )
+        logging.info(
+            "%d activities registered in %.1f ms",
+            len(self.activities.names()),
+            (time.perf_counter() - started) * 1000,
         )
 
-        # Initialize full screen blocker
-        self.screen_blocker = MultiScreenBlocker()
+    def prepare_break(self, activity: str):
+        """Create and lay out the blockers and break window ahead of a break."""
+        started = time.perf_counter()
+        if self.activities.needs_blocker(activity):
+            self.screen_blocker.prepare()
+        self.break_window.prepare(activity)
+        logging.debug(
+            "Break prepared in %.1f ms", (time.perf_counter() - started) * 1000
+        )
 
-        # Start amber blinking immediately as neither work nor break is active
-        self.start_blinking("amber")
+    def hide_break(self):
+        """Hide the break window and screen blockers if they have been created."""
+        if self._break_window is not None:
+            self._break_window.hide()
+            self._break_window.hide_custom_widgets()
+        if self._screen_blocker is not None:
+            self._screen_blocker.hide()
 
-        logging.info("ActiveBreaksApp initialized")
+    def release_break_resources(self):
+        """Free what only a break uses and trim caches to the memory budget.
+
+        The break window and blockers are built again when the next break is
+        prepared, a few seconds before it starts.
+        """
+        if self._break_window is not None:
+            self._break_window.deleteLater()
+            self._break_window = None
+        if self._screen_blocker is not None:
+            self._screen_blocker.close()
+            self._screen_blocker = None
+        self.activities.release_caches()
+        FullScreenBlocker._brushes.clear()
+
+        budget_kb = self.settings.current.memory_budget
+        QPixmapCache.setCacheLimit(budget_kb)
+        QPixmapCache.clear()
+        self.icon_renderer.trim(budget_kb * 1024)
+        # Once the deleted windows are gone, give their memory back
+        QTimer.singleShot(1000, trim_heap)
+        logging.info("Break resources released")
 
     def toggle_work(self):
         """Toggle the work timer."""
@@ -767,118 +1201,224 @@ class ActiveBreaksApp(QSystemTrayIcon):
         logging.debug("Toggle break timer called")
         if self.is_active and not self.is_working:
             self.stop_timer()
-            self.break_window.hide()
         else:
             self.start_break()
 
     def start_work(self):
         """Start the work timer."""
-        self.stop_timer()  # stop break activities if it wasn't stopped manually
-
         logging.info("Starting work timer")
-        self.is_working = True
-        self.is_active = True
-        self.time_left = self.work_duration
-        self.timer.start(1000)  # Update every second
-        self.update_timer()
-        self.update_menu_text()
-        self.stop_blinking()  # Stop blinking when work starts
-        self.screen_blocker.hide()  # Hide screen blocker when work starts
-        logging.debug(f"Work timer started. Duration: {self.work_duration} seconds")
+        self.engine.start_work()
 
     def start_break(self):
         """Start the break timer."""
         logging.info("Starting break timer")
-        self.is_working = False
-        self.is_active = True
-        self.time_left = self.break_duration
-        self.timer.start(1000)  # Update every second
-        self.update_timer()
-        self.update_menu_text()
-        self.stop_blinking()  # Stop blinking when break starts
-        self.screen_blocker.show()  # Show full screen blocker during break
-        self.show_break_activity()
-        logging.debug(f"Break timer started. Duration: {self.break_duration} seconds")
+        self.engine.start_break()
 
     def stop_timer(self):
         """Stop the active timer and hide the break activity window."""
         logging.info("Stopping timer")
+        self.engine.stop()
+
+    def poll_engine(self):
+        """Apply the engine transitions whose deadlines have passed."""
+        # After a suspend several deadlines may have passed at once, only the
+        # resulting state needs to be shown
+        self._replaying = True
+        try:
+            transitions = self.engine.poll()
+        finally:
+            self._replaying = False
+        if transitions:
+            self.apply_transition(transitions[-1])
+
+    def on_transition(self, transition: Transition):
+        if self.journal is not None:
+            details = {}
+            if transition.previous is Phase.BREAK and self._break_window is not None:
+                details["glasses"] = self._break_window.glasses_drunk()
+            self.journal.record_transition(transition, **details)
+        if not self._replaying:
+            self.apply_transition(transition)
+
+    def apply_transition(self, transition: Transition):
+        """Update the tray and break windows for a new engine phase."""
         self.timer.stop()
-        self.is_active = False
-        self.update_icon(0)
-        self.setToolTip("")
-        self.update_menu_text()
-        self.break_window.hide()
-        self.screen_blocker.hide()  # Hide screen blocker when timer stops
-        self.start_blinking("amber")  # Start amber blinking when timer stops
-        self.break_window.hide_custom_widgets()
-        logging.debug("Timer stopped and UI updated")
-
-    def update_timer(self):
-        """Update the timer countdown and UI elements."""
-        if self.time_left > 0:
-            minutes, seconds = divmod(self.time_left, 60)
-            time_str = f"{minutes:02d}:{seconds:02d}"
-            current_state = "Work" if self.is_working else "Break"
-            self.setToolTip(f"{current_state}: {time_str}")
-
-            progress = 1 - (
-                self.time_left
-                / (self.work_duration if self.is_working else self.break_duration)
+        self.wakeup_timer.stop()
+
+        # Reminders wait for the end of a break, which also counts as them
+        if transition.phase in (Phase.BREAK_PENDING, Phase.BREAK):
+            self.reminders.hold()
+        elif self.reminders.is_held and not self.user_away:
+            satisfied = transition.previous is Phase.BREAK
+            self.reminders.release(transition.at, satisfied=satisfied)
+
+        if transition.phase is Phase.WORK:
+            self.stop_blinking()  # Stop blinking when work starts
+            self.hide_break()  # Hide screen blocker when work starts
+            if self.settings.current.memory_budget > 0:
+                self.release_break_resources()
+            logging.debug(
+                "Work timer started. Duration: %s seconds", self.work_duration
+            )
+        elif transition.phase is Phase.BREAK:
+            started = time.perf_counter()
+            self.stop_blinking()  # Stop blinking when break starts
+            if self.activities.needs_blocker(transition.activity):
+                self.screen_blocker.show()  # Show full screen blocker during break
+            with self.diagnostics.measure("show_break_activity"):
+                self.show_break_activity(transition.activity)
+            self.break_start_latency = (time.perf_counter() - started) * 1000
+            logging.info("Break shown in %.1f ms", self.break_start_latency)
+            logging.debug(
+                "Break timer started. Duration: %s seconds", self.break_duration
             )
-            self.update_icon(progress)
-            self.time_left -= 1
-            logging.debug(f"Timer updated: {current_state} - {time_str}")
         else:
-            logging.info("Timer finished")
-            if self.is_working:
-                self.stop_timer()
-                # Start blue blinking before break
+            self.update_icon(0)
+            self.setToolTip("")
+            self.hide_break()  # Hide screen blocker when timer stops
+            if transition.phase is Phase.BREAK_PENDING:
+                # Start blue blinking before break and use the lead time to
+                # build everything the break will show
                 self.start_blinking("blue")
-                # Start break after a 3-second delay
-                self.delay_timer.start(3000)
-                logging.info("Work finished. Break will start in 3 seconds.")
+                self.prepare_break(transition.activity)
+                logging.info(
+                    "Work finished. Break will start in %s seconds.",
+                    self.engine.break_delay,
+                )
             else:
-                self.stop_timer()
-                logging.info("Break finished.")
+                self.start_blinking("amber")  # Start amber blinking when idle
+                if transition.previous is Phase.BREAK:
+                    logging.info("Break finished.")
+        self.update_menu_text()
+        self.schedule_wakeup()
+        self.update_timer()
+        self.memory.sample(transition.phase.value)
+
+    def on_wakeup(self):
+        self._record_lateness(self._wakeup_due)
+        self.poll_engine()
+        self.poll_reminders()
+
+    def schedule_wakeup(self):
+        """Wake up at the earliest engine or reminder deadline, if any."""
+        self.wakeup_timer.stop()
+        deadlines = [self.engine.next_deadline(), self.reminders.next_deadline()]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        if deadlines:
+            delay = max(0, math.ceil((min(deadlines) - self.engine.clock()) * 1000))
+            self._wakeup_due = self.engine.clock() + delay / 1000
+            self.wakeup_timer.start(delay)
+
+    def set_reminders(self, rules: str):
+        """Replace the reminders with the "minutes:activity" `rules`."""
+        self.reminders.clear()
+        for reminder in parse_reminders(rules):
+            self.reminders.add(reminder)
+        logging.info("%d reminders scheduled", len(self.reminders))
+        self.schedule_wakeup()
+
+    def poll_reminders(self):
+        """Show every reminder that is due as one notification."""
+        break_at = self.engine.next_deadline() if self.is_working else None
+        due = self.reminders.poll(break_at=break_at)
+        if due:
+            activities = list(dict.fromkeys(reminder.activity for reminder in due))
+            self.showMessage("Active Breaks", "\n".join(activities))
+            logging.info("Reminders due: %s", activities)
+        self.schedule_wakeup()
+
+    def start_idle_monitor(self, backend: IdleBackend):
+        """Start watching `backend` for the user leaving and coming back."""
+        self.idle_monitor = IdleMonitor(
+            backend,
+            threshold=self.settings.current.idle_threshold,
+            on_away=self.on_user_away,
+            on_back=self.on_user_back,
+            clock=self.engine.clock,
+        )
+        self.poll_idle()
 
-    def update_icon(self, progress: float = 0, color: str = None):
-        """Update the tray icon to reflect the current progress."""
-        self.icon_pixmap.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(self.icon_pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    def poll_idle(self):
+        interval = self.idle_monitor.poll()
+        self.idle_timer.start(int(interval * 1000))
 
-        # Draw background circle
-        background_color = QColor(200, 200, 200)
-        painter.setBrush(background_color)
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawEllipse(QRectF(0, 0, 32, 32))
+    def on_user_away(self, since: float):
+        """Pause work and stop every tray timer nobody is there to see."""
+        self.engine.user_away(since)
+        self.timer.stop()
+        if self.blink_timer.isActive():
+            self.stop_blinking()
+        self.reminders.hold()
+        self.schedule_wakeup()
+        if self.engine.timer.is_paused:
+            self.setToolTip("Work: paused")
+        logging.info("User away, phase: %s", self.engine.phase.value)
+
+    def on_user_back(self, away_since: float, returned_at: float):
+        """Resume or restart work and bring back the tray timers."""
+        self._replaying = True
+        try:
+            transitions = self.engine.user_back(returned_at)
+        finally:
+            self._replaying = False
+        if self.engine.phase not in (Phase.BREAK_PENDING, Phase.BREAK):
+            # Time away from the desk counts as a break from every reminder
+            self.reminders.release(returned_at, satisfied=True)
+        if transitions:
+            # The absence was credited as a break, show the new work phase
+            self.apply_transition(transitions[-1])
+            return
 
-        # Draw progress arc if there is progress
-        if progress > 0:
-            progress_color = (
-                QColor(0, 120, 212) if self.is_working else QColor(76, 175, 80)
-            )
-            painter.setBrush(progress_color)
-            start_angle = 90 * 16
-            span_angle = int(-progress * 360 * 16)
-            painter.drawPie(0, 0, 32, 32, start_angle, span_angle)
+        if self.engine.phase in (Phase.IDLE, Phase.BREAK_PENDING):
+            self.start_blinking(self.blink_color)
+        self.schedule_wakeup()
+        self.update_timer()
+        logging.info("User back, phase: %s", self.engine.phase.value)
 
-        # Draw inner circle
-        if color == "amber":
-            inner_color = QColor(255, 191, 0)  # Amber color
-        elif color == "blue":
-            inner_color = QColor(0, 120, 212)  # Blue color
-        else:
-            inner_color = (
-                QColor(0, 120, 212) if self.is_working else QColor(76, 175, 80)
-            )
-        painter.setBrush(inner_color)
-        painter.drawEllipse(QRectF(8, 8, 16, 16))
+    def on_tick(self):
+        self._record_lateness(self._tick_due)
+        self.update_timer()
 
-        painter.end()
-        self.setIcon(QIcon(self.icon_pixmap))
-        logging.debug(f"Icon updated with progress: {progress:.2f}, color: {color}")
+    def _record_lateness(self, due: float):
+        """Record how late a timer fired, a measure of event-loop latency."""
+        if due is not None:
+            self.diagnostics.record("event_loop", max(0, self.engine.clock() - due))
+
+    def update_timer(self):
+        """Update the tooltip and icon from the time left in the current phase."""
+        if not self.is_active or self.user_away:
+            return
+
+        # A deadline that passed while the machine was asleep is caught here,
+        # since Qt timers do not advance during suspend
+        if self.engine.timer.expired():
+            self.poll_engine()
+            return
+
+        remaining = self.engine.remaining()
+        seconds_left = math.ceil(remaining)
+        minutes, seconds = divmod(seconds_left, 60)
+        current_state = "Work" if self.is_working else "Break"
+        self.setToolTip(f"{current_state}: {minutes:02d}:{seconds:02d}")
+        self.update_icon(self.engine.progress())
+
+        # Wake up again just after the displayed second changes
+        next_tick = remaining - (seconds_left - 1)
+        delay = max(1, int(next_tick * 1000) + 5)
+        # Coarse timers may fire up to 5% late without the event loop lagging
+        self._tick_due = self.engine.clock() + delay * 1.05 / 1000
+        self.timer.start(delay)
+        logging.debug("Timer updated: %s - %02d:%02d", current_state, minutes, seconds)
+
+    def update_icon(self, progress: float = 0, color: str = None):
+        """Update the tray icon to reflect the current progress."""
+        key = self.icon_renderer.frame_key(self.is_working, progress, color)
+        if key == self._icon_key:
+            return
+
+        self._icon_key = key
+        self.setIcon(self.icon_renderer.icon(key))
+        logging.debug("Icon updated with progress: %.2f, color: %s", progress, color)
 
     def update_menu_text(self):
         """Update the text of the menu actions based on the current state."""
@@ -893,58 +1433,80 @@ class ActiveBreaksApp(QSystemTrayIcon):
             self.work_action.setText("Start Work")
             self.break_action.setText("Start Break")
         logging.debug(
-            f"Menu text updated. Is active: {self.is_active}, Is working: {self.is_working}"
+            "Menu text updated. Is active: %s, Is working: %s",
+            self.is_active,
+            self.is_working,
         )
 
     def show_settings(self):
         """Display the settings dialog."""
         logging.info("Opening settings dialog")
-        dialog = SettingsDialog(
-            self.work_duration,
-            self.break_duration,
-            self.hold_duration,
-            self.breath_duration,
-        )
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            (
+        with self.diagnostics.measure("show_settings"):
+            dialog = SettingsDialog(
                 self.work_duration,
                 self.break_duration,
                 self.hold_duration,
                 self.breath_duration,
-            ) = dialog.get_settings()
-            self.save_settings()
-            logging.info(
-                f"Settings updated: Work duration: {self.work_duration}, Break duration: {self.break_duration}, Hold duration: {self.hold_duration}, Breath duration: {self.breath_duration}"
             )
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            work_duration, break_duration, hold_duration, breath_duration = (
+                dialog.get_settings()
+            )
+            with self.diagnostics.measure("show_settings"):
+                self.settings.update(
+                    work_duration=work_duration,
+                    break_duration=break_duration,
+                    hold_duration=hold_duration,
+                    breath_duration=breath_duration,
+                )
         else:
             logging.info("Settings dialog cancelled")
 
-    def save_settings(self):
-        """Save the current settings."""
-        logging.debug("Saving settings")
-        self.settings.setValue("work_duration", self.work_duration)
-        self.settings.setValue("break_duration", self.break_duration)
-        self.settings.setValue("hold_duration", self.hold_duration)
-        self.settings.setValue("breath_duration", self.breath_duration)
-        self.settings.sync()
-        logging.info("Settings saved")
-
-    def select_random_activity(self):
-        if not self.remaining_activities:
-            self.remaining_activities = self.break_activities.copy()
-            logging.info("All activities have been shown. Resetting the list.")
-
-        activity = random.choice(self.remaining_activities)
-        self.remaining_activities.remove(activity)
-        logging.debug(f"Selected activity: {activity}")
-        logging.debug(f"Remaining activities: {self.remaining_activities}")
-
-        return activity
-
-    def show_break_activity(self):
-        """Show the break activity window with a random activity."""
-        activity = self.select_random_activity()
-        self.break_window.set_activity(activity)
+    def apply_settings(self, settings: Settings, old: Settings):
+        """Apply changed settings to the engine, idle monitor and break window."""
+        # Durations take effect from the next phase
+        self.work_duration = settings.work_duration
+        self.break_duration = settings.break_duration
+        if self.idle_monitor is not None:
+            self.idle_monitor.threshold = settings.idle_threshold
+            if not self.user_away:
+                self.poll_idle()
+        if self._break_window is not None:
+            self._break_window.set_breath_timing(
+                settings.hold_duration, settings.breath_duration
+            )
+            self._break_window.set_breathing_frame_rate(
+                settings.breathing_fps, settings.low_power
+            )
+            # Widgets built until now are released when the current break ends
+            self._break_window.keep_warm = settings.keep_activity_widgets
+        if settings.reminders != old.reminders:
+            self.set_reminders(settings.reminders)
+        if self._screen_blocker is not None:
+            self._screen_blocker.fade_in_ms = settings.blocker_fade_in
+        if settings.memory_budget != old.memory_budget:
+            if settings.memory_budget > 0:
+                QPixmapCache.setCacheLimit(settings.memory_budget)
+                if self.is_working:
+                    self.release_break_resources()
+            else:
+                QPixmapCache.setCacheLimit(self._default_pixmap_cache_kb)
+        if settings.log_level != old.log_level:
+            logging.getLogger().setLevel(settings.log_level)
+            for action in self.log_level_group.actions():
+                action.setChecked(action.data() == settings.log_level)
+            logging.info("Log level set to %s", settings.log_level)
+
+    def set_log_level(self, action):
+        """Change the log level at runtime and remember it."""
+        self.settings.update(log_level=action.data())
+
+    def show_break_activity(self, activity: str = None):
+        """Show the break activity window with the given or a random activity."""
+        if activity is None:
+            activity = self.engine.select_activity()
+        if self.break_window.activity != activity:
+            self.break_window.set_activity(activity)
 
         # Position the window just below the system tray icon
         icon_geometry = self.geometry()
@@ -954,18 +1516,115 @@ class ActiveBreaksApp(QSystemTrayIcon):
         self.break_window.show()
         self.break_window.raise_()
         self.break_window.activateWindow()
-        logging.info(f"Break activity shown: {activity}")
+        logging.info("Break activity shown: %s", activity)
+
+    def show_statistics(self):
+        """Show today's and this week's totals from the session journal."""
+
+        def summary(title, stats):
+            return (
+                f"{title}: {stats['work_completed']} of {stats['work_sessions']} "
+                f"work sessions completed ({stats['work_seconds'] / 60:.0f} min), "
+                f"{stats['breaks'] - stats['breaks_skipped']} of {stats['breaks']} "
+                f"breaks taken, {stats['glasses']} glasses of water"
+            )
+
+        today = date.today()
+        with self.diagnostics.measure("show_statistics"):
+            text = (
+                summary("Today", self.journal.stats(today, today))
+                + "\n\n"
+                + summary("This week", self.journal.week_stats(today))
+            )
+        QMessageBox.information(None, "Active Breaks", text)
+
+    def show_diagnostics(self):
+        """Write the responsiveness metrics to a JSON file and summarise them."""
+        with self.diagnostics.measure("show_diagnostics"):
+            memory = self.memory.report(self.engine.phase.value)
+            try:
+                self.diagnostics.dump(diagnostics_file, memory=memory)
+                saved = f"Full report saved to {diagnostics_file}"
+            except OSError as e:
+                logging.exception("Unable to write %s", diagnostics_file)
+                saved = f"Unable to save the full report: {e}"
+        peaks = ", ".join(
+            f"{phase} {stats['peak_rss_mb']:.0f} MB"
+            for phase, stats in memory["phases"].items()
+        )
+        QMessageBox.information(
+            None,
+            "Active Breaks",
+            self.diagnostics.summary() + f"\nPeak memory by phase: {peaks}\n\n" + saved,
+        )
+
+    def status(self) -> dict:
+        return {
+            "phase": self.engine.phase.value,
+            "activity": self.engine.activity,
+            "remaining": round(self.engine.remaining(), 1),
+            "paused": self.engine.timer.is_paused,
+            "user_away": self.user_away,
+        }
+
+    def handle_command(self, request: dict) -> dict:
+        """Run a control request and return the response with the new status."""
+        if self.menu is None:
+            return {"ok": False, "error": "Still starting up"}
+
+        command = request.get("command") if isinstance(request, dict) else None
+        if not isinstance(command, str):
+            return {"ok": False, "error": "Invalid request"}
+        if command == "launch":
+            # Another launch of the app handing over its arguments
+            args = request.get("args", [])
+            if not isinstance(args, list) or not all(
+                isinstance(arg, str) for arg in args
+            ):
+                return {"ok": False, "error": "Invalid request"}
+            commands = [arg for arg in args if arg in control.COMMANDS]
+        else:
+            commands = [command]
+
+        actions = {
+            "status": None,
+            "diagnostics": None,
+            "memory": self.memory.start_tracing,
+            "start-work": self.start_work,
+            "start-break": self.start_break,
+            "stop": self.stop_timer,
+        }
+        for command in commands:
+            if command not in actions:
+                return {"ok": False, "error": f"Unknown command: {command}"}
+            logging.info("Control command: %s", command)
+            if actions[command] is not None:
+                actions[command]()
+        response = {"ok": True, "status": self.status()}
+        if "diagnostics" in commands:
+            response["diagnostics"] = self.diagnostics.to_dict()
+        if "memory" in commands:
+            # Heap figures start with the first request, which turns tracing on
+            response["memory"] = self.memory.report(self.engine.phase.value)
+        return response
 
     def quit_app(self):
         """Quit the application."""
         logging.info("Quitting application")
+        self.idle_timer.stop()
+        self.wakeup_timer.stop()
+        if self.journal is not None:
+            self.journal.close()
+        self.settings.flush()
         QApplication.instance().quit()
 
     def start_blinking(self, color: str):
         """Start blinking the icon with the specified color."""
         self.blink_color = color
+        if self.user_away:
+            return  # Resumes when the user is back
         self.blink_timer.start(500)  # Blink every 500 ms
-        logging.debug(f"{color.capitalize()} icon blinking started")
+        logging.debug("%s icon blinking started", color)
 
     def stop_blinking(self):
         """Stop blinking the icon and reset to normal state."""
@@ -980,19 +1639,56 @@ class ActiveBreaksApp(QSystemTrayIcon):
         if self.is_icon_visible:
             self.update_icon(color=self.blink_color)
         else:
-            self.setIcon(QIcon())
+            self._icon_key = None
+            self.setIcon(self.icon_renderer.blank_icon)
         logging.debug(
-            f"{self.blink_color.capitalize()} icon blink: {'visible' if self.is_icon_visible else 'hidden'}"
+            "%s icon blink: %s",
+            self.blink_color,
+            "visible" if self.is_icon_visible else "hidden",
         )
 
 
+def hand_over_launch():
+    """Pass the command line to a running instance and exit, if there is one."""
+    try:
+        response = control.send({"command": "launch", "args": sys.argv[1:]})
+    except (FileNotFoundError, ConnectionRefusedError):
+        return  # Not running
+    except TimeoutError:
+        # Running but busy, a second instance would take over its socket
+        logging.error("Active Breaks is running but did not answer in time")
+        sys.exit(1)
+    except OSError:
+        logging.exception("Unable to reach a running instance")
+        return
+    logging.info("Active Breaks is already running: %s", response)
+    sys.exit(0 if response.get("ok") else 1)
+
+
 def main():
     """Main function to run the Active Breaks application."""
+    setup_logging()
+
+    # Only one instance runs, a second launch hands its arguments over
+    hand_over_launch()
+
     logging.info("Starting Active Breaks application")
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
-    active_breaks_app = ActiveBreaksApp()
+    # Listen before building the app, requests wait for the event loop
+    control_server = ControlServer(handler=None)
+    if not control_server.listen() and control.is_listening(control_server.path):
+        # Another launch started listening since the check above
+        hand_over_launch()
+        sys.exit(1)
+    active_breaks_app = ActiveBreaksApp(fast_start="--fast-start" in sys.argv[1:])
+    control_server.handler = active_breaks_app.handle_command
     active_breaks_app.show()
+    app.aboutToQuit.connect(control_server.close)
+
+    # Commands given on the command line run once the app is initialised
+    launch = {"command": "launch", "args": sys.argv[1:]}
+    QTimer.singleShot(0, lambda: active_breaks_app.handle_command(launch))
     logging.info("Active Breaks application started and running")
     sys.exit(app.exec())
 
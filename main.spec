@@ -7,8 +7,14 @@ block_cipher = None
 a = Analysis(['main.py'],
              pathex=['.'],
              binaries=None,
-             datas=[('exercises', 'exercises')],
-             hiddenimports=[],
+             # Exercise images are packed into one atlas by `make atlas`
+             datas=[('exercises/exercises.atlas', 'exercises')],
+             hiddenimports=[
+                 # Activity widgets are imported by name when first shown
+                 'activities.breathing',
+                 'activities.exercises',
+                 'activities.hydration',
+             ],
              hookspath=None,
              runtime_hooks=None,
              excludes=None,
@@ -0,0 +1,118 @@
+"""Memory use by phase: resident set size, Python heap and cache sizes.
+
+`MemoryMonitor.sample` is called on every phase change and keeps the
+latest and peak readings per phase. Front ends register the caches they
+own as sources, callables returning their size in bytes, so the report
+shows where memory goes. The Python heap is only reported while
+tracemalloc is tracing, e.g. with PYTHONTRACEMALLOC=1 or after
+`start_tracing`, since tracing slows every allocation down.
+"""
+import ctypes.util
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> int:
+    """Current resident set size; the peak where the current one is unknown."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource  # Not on Windows, where /proc is missing too
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def trim_heap():
+    """Collect garbage and hand freed heap pages back to the system."""
+    gc.collect()
+    if not sys.platform.startswith("linux"):
+        return
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return
+    try:
+        ctypes.CDLL(libc_name).malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # Not glibc
+
+
+class MemoryMonitor:
+    """Latest and peak memory readings per phase, with named cache sources."""
+
+    def __init__(self):
+        self.phases: dict[str, dict] = {}
+        self.sources: dict[str, Callable[[], int]] = {}
+
+    def add_source(self, name: str, size: Callable[[], int]):
+        """Report `size()`, a cache size in bytes, as `name`."""
+        self.sources[name] = size
+
+    def source_sizes(self) -> dict[str, int]:
+        sizes = {}
+        for name, size in self.sources.items():
+            try:
+                sizes[name] = size()
+            except Exception:
+                logging.exception("Unable to measure %s", name)
+        return sizes
+
+    def sample(self, phase: str) -> dict:
+        """Record the memory in use now against `phase`."""
+        sample = {"time": time.time(), "rss_mb": round(rss_bytes() / MB, 1)}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sample["python_heap_mb"] = round(current / MB, 1)
+            sample["python_heap_peak_mb"] = round(peak / MB, 1)
+
+        stats = self.phases.setdefault(phase, {"samples": 0, "peak_rss_mb": 0.0})
+        stats["samples"] += 1
+        stats["peak_rss_mb"] = max(stats["peak_rss_mb"], sample["rss_mb"])
+        stats["last"] = sample
+        logging.debug("Memory in phase %s: %s", phase, sample)
+        return sample
+
+    @staticmethod
+    def start_tracing(frames: int = 1):
+        """Start tracing Python allocations, for heap figures in the report."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            logging.info("Tracing Python allocations")
+
+    @staticmethod
+    def top_allocations(limit: int = 15) -> list[dict]:
+        """The source lines holding the most traced memory."""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        return [
+            {
+                "location": str(stat.traceback[0]),
+                "kb": round(stat.size / 1024, 1),
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+    def report(self, phase: str) -> dict:
+        """Readings per phase, cache sizes now and the top Python allocations."""
+        self.sample(phase)
+        return {
+            "phases": self.phases,
+            "caches_kb": {
+                name: round(size / 1024, 1)
+                for name, size in self.source_sizes().items()
+            },
+            "top_allocations": self.top_allocations(),
+        }
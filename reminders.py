@@ -0,0 +1,173 @@
+"""Qt-free scheduler for reminders that run alongside the work/break cycle.
+
+Any number of recurring and one-off reminders are kept in a heap ordered by
+due time, so the caller only ever needs one wakeup, at `next_deadline`.
+While a break is on (or about to start) reminders are held; a break counts
+as having done every recurring reminder, which then starts its interval
+again when the break ends.
+"""
+import heapq
+import itertools
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from engine import monotonic
+
+
+@dataclass
+class Reminder:
+    """A reminder to `activity`, every `interval` seconds or once at `due`."""
+
+    name: str
+    activity: str
+    interval: float = None
+    due: float = None
+
+    @property
+    def is_recurring(self) -> bool:
+        return self.interval is not None
+
+
+def parse_reminders(text: str) -> list[Reminder]:
+    """Parse "minutes:activity" rules separated by semicolons.
+
+    For example "20:Look at something 20 feet away;45:Get a glass of water".
+    Each rule is a reminder of its own, named after its position, so two
+    rules for the same activity both stay.
+    """
+    reminders = []
+    for index, rule in enumerate(text.split(";")):
+        if not rule.strip():
+            continue
+        minutes, _, activity = rule.partition(":")
+        try:
+            interval = float(minutes) * 60
+        except ValueError:
+            logging.warning("Ignoring invalid reminder rule: %r", rule)
+            continue
+        if interval <= 0 or not activity.strip():
+            logging.warning("Ignoring invalid reminder rule: %r", rule)
+            continue
+        activity = activity.strip()
+        reminders.append(Reminder(f"{index}:{activity}", activity, interval=interval))
+    return reminders
+
+
+class ReminderScheduler:
+    """Keeps reminders in a heap and hands out the ones that are due.
+
+    Removing or rescheduling a reminder leaves its old heap entry behind;
+    entries whose time no longer matches the reminder are skipped when they
+    reach the top.
+    """
+
+    def __init__(
+        self,
+        reminders: list[Reminder] = (),
+        coalesce_window: float = 120,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.coalesce_window = coalesce_window
+        self.clock = clock
+        self.reminders: dict[str, Reminder] = {}
+        self._due: dict[str, float] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self.is_held = False
+        for reminder in reminders:
+            self.add(reminder)
+
+    def __len__(self) -> int:
+        return len(self.reminders)
+
+    def add(self, reminder: Reminder, at: float = None):
+        """Add or replace a reminder, counting its interval from `at`."""
+        at = self.clock() if at is None else at
+        self.reminders[reminder.name] = reminder
+        due = at + reminder.interval if reminder.due is None else reminder.due
+        self._schedule(reminder, due)
+
+    def remove(self, name: str):
+        self.reminders.pop(name, None)
+        self._due.pop(name, None)
+
+    def clear(self):
+        self.reminders.clear()
+        self._due.clear()
+        self._heap.clear()
+
+    def _schedule(self, reminder: Reminder, due: float):
+        self._due[reminder.name] = due
+        heapq.heappush(self._heap, (due, next(self._counter), reminder.name))
+
+    def _peek(self) -> tuple[float, str] | None:
+        """The earliest live heap entry, dropping stale ones on the way."""
+        heap = self._heap
+        while heap:
+            due, _, name = heap[0]
+            if self._due.get(name) == due:
+                return due, name
+            heapq.heappop(heap)
+        return None
+
+    def next_deadline(self) -> float | None:
+        """Clock time of the earliest reminder, None while held or empty."""
+        if self.is_held:
+            return None
+        entry = self._peek()
+        return None if entry is None else entry[0]
+
+    def hold(self):
+        """Keep every reminder back until `release`, e.g. during a break."""
+        self.is_held = True
+
+    def release(self, at: float = None, satisfied: bool = False):
+        """Stop holding reminders back.
+
+        With `satisfied`, the hold was a break: recurring reminders start
+        their interval again from `at`. Otherwise reminders that fell due
+        during the hold are handed out by the next `poll`.
+        """
+        self.is_held = False
+        if not satisfied:
+            return
+        at = self.clock() if at is None else at
+        for reminder in self.reminders.values():
+            if reminder.is_recurring:
+                self._schedule(reminder, at + reminder.interval)
+
+    def poll(self, at: float = None, break_at: float = None) -> list[Reminder]:
+        """Return the reminders due by `at` and schedule their next repeat.
+
+        If a break starts at `break_at` within `coalesce_window`, due
+        reminders are held for the break instead of being handed out.
+        """
+        if self.is_held:
+            return []
+        at = self.clock() if at is None else at
+        entry = self._peek()
+        if entry is None or entry[0] > at:
+            return []
+        if break_at is not None and break_at - at <= self.coalesce_window:
+            logging.debug("Holding reminders for the break in %.0f s", break_at - at)
+            self.hold()
+            return []
+
+        due_reminders = []
+        while entry is not None and entry[0] <= at:
+            due, name = entry
+            heapq.heappop(self._heap)
+            reminder = self.reminders[name]
+            due_reminders.append(reminder)
+            if reminder.is_recurring:
+                # Repeats missed while suspended are folded into this one
+                next_due = due + reminder.interval
+                if next_due <= at:
+                    next_due = at + reminder.interval
+                self._schedule(reminder, next_due)
+            else:
+                del self.reminders[name]
+                del self._due[name]
+            entry = self._peek()
+        return due_reminders
@@ -0,0 +1,98 @@
+"""Pack the exercise images at 1x, 2x and 3x into a single sprite atlas.
+
+Frames larger than the source are scaled up once here with smooth
+filtering, rather than on every paint on a HiDPI screen. Frames are
+zlib-compressed unless --raw is given; raw frames make the atlas much
+larger but are shown straight from the mapped file.
+
+Usage:
+    python scripts/build_atlas.py [--output FILE] [--scales 1 2 3] [--raw]
+"""
+import argparse
+import json
+import sys
+import zlib
+from pathlib import Path
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from activities.atlas import ALIGNMENT  # noqa: E402
+from activities.atlas import HEADER  # noqa: E402
+from activities.atlas import IMAGE_FORMAT  # noqa: E402
+from activities.atlas import MAGIC  # noqa: E402
+from activities.exercises import ATLAS_PATH  # noqa: E402
+from activities.exercises import EXERCISE_IMAGES  # noqa: E402
+
+
+def frame_pixels(image: QImage, scale: int) -> QImage:
+    if scale != 1:
+        image = image.scaled(
+            image.width() * scale,
+            image.height() * scale,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+    return image.convertToFormat(IMAGE_FORMAT)
+
+
+def build(output: Path, scales: list[int], raw: bool):
+    frames, blobs = [], []
+    for relative_path in EXERCISE_IMAGES:
+        source = QImage(str(ROOT / relative_path))
+        if source.isNull():
+            raise SystemExit(f"Unable to read {relative_path}")
+        variants = []
+        for scale in scales:
+            image = frame_pixels(source, scale)
+            pixels = image.constBits().asstring(image.sizeInBytes())
+            data = pixels if raw else zlib.compress(pixels, 9)
+            variants.append(
+                {
+                    "scale": scale,
+                    "width": image.width(),
+                    "height": image.height(),
+                    "length": len(data),
+                    "codec": "raw" if raw else "zlib",
+                }
+            )
+            blobs.append(data)
+        frames.append({"name": Path(relative_path).stem, "variants": variants})
+
+    # Offsets depend on the index length, which depends on the offsets;
+    # reserving room for them up front settles it in one pass
+    variants = [variant for frame in frames for variant in frame["variants"]]
+    for variant in variants:
+        variant["offset"] = 0
+    index_length = len(json.dumps({"frames": frames}).encode()) + 16 * len(variants)
+    offset = HEADER.size + index_length
+    for variant in variants:
+        offset += -offset % ALIGNMENT
+        variant["offset"] = offset
+        offset += variant["length"]
+    index = json.dumps({"frames": frames}).encode().ljust(index_length)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        for variant, data in zip(variants, blobs):
+            f.write(b"\0" * (variant["offset"] - f.tell()))
+            f.write(data)
+    print(f"Wrote {len(frames)} frames at {scales}x to {output} ({offset} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=ROOT / ATLAS_PATH)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--raw", action="store_true", help="Do not compress frames")
+    args = parser.parse_args()
+    build(args.output, sorted(args.scales), args.raw)
+
+
+if __name__ == "__main__":
+    main()
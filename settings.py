@@ -0,0 +1,65 @@
+"""Typed, immutable snapshot of the user's settings.
+
+Nothing in this module imports PyQt6: the values are read and written by
+whichever front end owns the storage, this only defines their names, types
+and defaults.
+"""
+import logging
+from collections.abc import Mapping
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import fields
+from dataclasses import replace
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+
+@dataclass(frozen=True)
+class Settings:
+    work_duration: int = 1500  # seconds, 25 minutes
+    break_duration: int = 300  # seconds, 5 minutes
+    hold_duration: int = 5000  # milliseconds
+    breath_duration: int = 7000  # milliseconds
+    idle_threshold: int = 300  # seconds
+    blocker_fade_in: int = 0  # milliseconds, 0 shows the blocker at once
+    breathing_fps: int = 30  # 0 repaints on every animation step
+    low_power: bool = False
+    # Kilobytes of cached pixmaps kept during work, 0 keeps break resources
+    # resident between breaks
+    memory_budget: int = 0
+    # Keep activity widgets built between breaks instead of releasing them
+    keep_activity_widgets: bool = False
+    # Extra reminders as "minutes:activity" rules separated by semicolons
+    reminders: str = ""
+    log_level: str = "INFO"
+
+    @classmethod
+    def from_values(cls, values: Mapping[str, object]) -> "Settings":
+        """Build a snapshot from stored values, ignoring missing or invalid ones."""
+        kwargs = {}
+        for field in fields(cls):
+            value = values.get(field.name)
+            if value is None:
+                continue
+            if field.type is bool and isinstance(value, str):
+                # INI files store booleans as text
+                value = value.lower() in ("true", "1", "yes")
+            try:
+                kwargs[field.name] = field.type(value)
+            except (TypeError, ValueError):
+                logging.warning("Ignoring invalid setting %s=%r", field.name, value)
+        settings = cls(**kwargs)
+        if settings.log_level not in LOG_LEVELS:
+            settings = replace(settings, log_level=cls.log_level)
+        return settings
+
+    def to_values(self) -> dict[str, object]:
+        return asdict(self)
+
+    def changed_fields(self, other: "Settings") -> set[str]:
+        """Names of the settings that differ between `other` and this snapshot."""
+        return {
+            field.name
+            for field in fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        }
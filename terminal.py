@@ -0,0 +1,316 @@
+"""Terminal front end of Active Breaks, for machines without a system tray.
+
+Runs the same work/break cycle, activity rotation and reminders as the
+tray app from the same settings, shows the phase on a status line and
+announces breaks with desktop notifications. Nothing here imports PyQt6,
+so it starts in a few tens of milliseconds and stays small.
+
+Usage:
+    python terminal.py [start-work|start-break] [--no-notify]
+
+Type a command and press Enter: w starts work, b a break, s stops and
+q quits. Without a terminal on stdin the cycle runs unattended.
+"""
+import argparse
+import configparser
+import json
+import logging
+import math
+import os
+import select
+import shutil
+import subprocess
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+from activities import ActivityRegistry
+from engine import BreakEngine
+from engine import monotonic
+from engine import Phase
+from engine import Transition
+from journal import JOURNAL_DIR
+from journal import SessionJournal
+from reminders import parse_reminders
+from reminders import ReminderScheduler
+from settings import Settings
+
+ORGANIZATION = "deskriders"
+APPLICATION = "activebreaks"
+LOG_FILE = Path.home() / ".logs" / "active_breaks" / "terminal.log"
+# The journal's rollups assume a single writer, the tray app has its own
+TERMINAL_JOURNAL_DIR = JOURNAL_DIR / "terminal"
+
+KEYS = {"w": "start-work", "b": "start-break", "s": "stop", "q": "quit"}
+
+
+def settings_path() -> Path:
+    """Path of the file QSettings keeps the tray app's settings in."""
+    if sys.platform == "darwin":
+        return (
+            Path.home()
+            / "Library"
+            / "Preferences"
+            / f"com.{ORGANIZATION}.{APPLICATION}.plist"
+        )
+    config_home = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(config_home) / ORGANIZATION / f"{APPLICATION}.conf"
+
+
+def _ini_value(raw: str) -> str:
+    # QSettings quotes strings holding separators and doubles a leading @
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    if raw.startswith("@@"):
+        raw = raw[1:]
+    return raw
+
+
+def read_settings(path: Path = None) -> Settings:
+    """Read the tray app's settings without QSettings, defaults if missing."""
+    path = settings_path() if path is None else Path(path)
+    values = {}
+    try:
+        if path.suffix == ".plist":
+            import plistlib  # Only needed on macOS
+
+            with path.open("rb") as f:
+                values = plistlib.load(f)
+        else:
+            parser = configparser.ConfigParser(interpolation=None)
+            parser.read(path)
+            if parser.has_section("General"):
+                values = {
+                    key: _ini_value(value) for key, value in parser["General"].items()
+                }
+    except (OSError, ValueError, configparser.Error):
+        logging.exception("Unable to read settings from %s", path)
+    return Settings.from_values(values)
+
+
+def notify(title: str, message: str):
+    """Show a desktop notification, if the platform has a way to."""
+    if sys.platform == "darwin":
+        script = f"display notification {json.dumps(message)}"
+        command = ["osascript", "-e", f"{script} with title {json.dumps(title)}"]
+    elif shutil.which("notify-send"):
+        command = ["notify-send", "--app-name=Active Breaks", title, message]
+    else:
+        return
+    try:
+        subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        logging.warning("Unable to show a notification with %s", command[0])
+
+
+class TerminalApp:
+    """Drives the engine from a select() loop on stdin and prints its phases."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        notifier: Callable[[str, str], None] = notify,
+        stdin=sys.stdin,
+        out=sys.stdout,
+        journal: SessionJournal = None,
+        settings_file: Path = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.settings = settings
+        self.settings_file = settings_file
+        self._settings_mtime = self._mtime()
+        self.notifier = notifier
+        self.stdin = stdin
+        self.out = out
+        self.interactive = stdin is not None and stdin.isatty()
+        self.journal = journal
+        self.running = True
+
+        # Entry points are slow to look up, only manifests are loaded here
+        self.activities = ActivityRegistry()
+        self.activities.discover(entry_points=False)
+        self.engine = BreakEngine(
+            settings.work_duration, settings.break_duration, clock=clock
+        )
+        self.engine.set_activities(
+            self.activities.names(),
+            self.activities.weights(),
+            self.activities.durations(),
+        )
+        self.engine.subscribe(self.on_transition)
+        self.reminders = ReminderScheduler(
+            parse_reminders(settings.reminders), clock=clock
+        )
+
+    def _mtime(self) -> float | None:
+        try:
+            return os.stat(self.settings_file).st_mtime
+        except (OSError, TypeError):
+            return None
+
+    def reload_settings(self):
+        """Pick up settings saved by the tray app or an editor since last time."""
+        mtime = self._mtime()
+        if mtime == self._settings_mtime:
+            return
+        self._settings_mtime = mtime
+        settings = read_settings(self.settings_file)
+        if settings != self.settings:
+            self.apply_settings(settings)
+
+    def apply_settings(self, settings: Settings):
+        """Use new durations and reminders, the running phase keeps its own."""
+        old, self.settings = self.settings, settings
+        self.engine.work_duration = settings.work_duration
+        self.engine.break_duration = settings.break_duration
+        if settings.reminders != old.reminders:
+            self.reminders.clear()
+            for reminder in parse_reminders(settings.reminders):
+                self.reminders.add(reminder)
+        logging.info("Settings changed: %s", sorted(settings.changed_fields(old)))
+
+    def on_transition(self, transition: Transition):
+        if self.journal is not None:
+            self.journal.record_transition(transition)
+
+        if transition.phase in (Phase.BREAK_PENDING, Phase.BREAK):
+            self.reminders.hold()
+        elif self.reminders.is_held:
+            satisfied = transition.previous is Phase.BREAK
+            self.reminders.release(transition.at, satisfied=satisfied)
+
+        if transition.phase is Phase.WORK:
+            minutes, seconds = divmod(round(self.engine.work_duration), 60)
+            self.show(f"Work started, break in {minutes:02d}:{seconds:02d}")
+        elif transition.phase is Phase.BREAK_PENDING:
+            self.show(f"Break in {self.engine.break_delay:.0f} seconds")
+        elif transition.phase is Phase.BREAK:
+            self.show(f"Break: {transition.activity}", bell=True)
+            self.notifier("Time for a break", transition.activity or "")
+        elif transition.previous is Phase.BREAK and transition.completed:
+            self.show("Break finished, start work when you are back", bell=True)
+            self.notifier("Break finished", "Start work when you are back")
+        else:
+            self.show("Stopped")
+
+    def show(self, message: str, bell: bool = False):
+        logging.info(message)
+        if self.interactive:
+            # Clear the status line before printing over it
+            message = "\r\x1b[K" + message + ("\a" if bell else "")
+        print(message, file=self.out, flush=True)
+
+    def status_line(self) -> str:
+        phase = self.engine.phase
+        if phase is Phase.IDLE:
+            return "Idle - [w]ork [b]reak [q]uit: "
+        minutes, seconds = divmod(math.ceil(self.engine.remaining()), 60)
+        return (
+            f"{phase.value} {minutes:02d}:{seconds:02d}"
+            " - [w]ork [b]reak [s]top [q]uit: "
+        )
+
+    def run_command(self, command: str):
+        actions = {
+            "start-work": self.engine.start_work,
+            "start-break": self.engine.start_break,
+            "stop": self.engine.stop,
+        }
+        if command == "quit":
+            self.running = False
+        elif command in actions:
+            actions[command]()
+        elif command:
+            self.show(f"Unknown command: {command}")
+
+    def next_timeout(self) -> float | None:
+        """Seconds until the loop has something to do, None to wait for input."""
+        deadlines = [self.engine.next_deadline(), self.reminders.next_deadline()]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        now = self.engine.clock()
+        if self.interactive and self.engine.phase is not Phase.IDLE:
+            # Just after the displayed second changes
+            remaining = self.engine.remaining()
+            deadlines.append(now + remaining - (math.ceil(remaining) - 1) + 0.005)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - now)
+
+    def step(self, timeout: float | None):
+        """Wait for input or the next deadline, then act on whichever came."""
+        readable = [self.stdin] if self.stdin is not None else []
+        if readable or timeout is not None:
+            ready, _, _ = select.select(readable, [], [], timeout)
+        else:
+            ready = []
+        if ready:
+            line = self.stdin.readline()
+            if not line:
+                # stdin was closed, keep running unattended
+                self.stdin = None
+                self.interactive = False
+            else:
+                command = line.strip().lower()
+                self.run_command(KEYS.get(command, command))
+
+        self.reload_settings()
+        self.engine.poll()
+        due = self.reminders.poll(
+            break_at=self.engine.next_deadline() if self.engine.is_working else None
+        )
+        if due:
+            activities = list(dict.fromkeys(reminder.activity for reminder in due))
+            self.show("Reminder: " + ", ".join(activities), bell=True)
+            self.notifier("Active Breaks", "\n".join(activities))
+
+    def run(self):
+        while self.running:
+            if self.interactive:
+                self.out.write("\r\x1b[K" + self.status_line())
+                self.out.flush()
+            timeout = self.next_timeout()
+            if timeout is None and self.stdin is None:
+                break  # Idle with nobody to start work
+            self.step(timeout)
+        if self.interactive:
+            self.out.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", nargs="?", choices=["start-work", "start-break"])
+    parser.add_argument(
+        "--no-notify", action="store_true", help="Do not show notifications"
+    )
+    args = parser.parse_args()
+
+    path = settings_path()
+    settings = read_settings(path)
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=settings.log_level,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    journal = SessionJournal(TERMINAL_JOURNAL_DIR)
+    journal.start()
+    app = TerminalApp(
+        settings,
+        notifier=(lambda title, message: None) if args.no_notify else notify,
+        journal=journal,
+        settings_file=path,
+    )
+    if args.command:
+        app.run_command(args.command)
+    try:
+        app.run()
+    except KeyboardInterrupt:
+        print(file=app.out)
+    finally:
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+
+from PyQt6.QtCore import QEvent  # noqa: E402
+from PyQt6.QtCore import QEventLoop  # noqa: E402
+from PyQt6.QtCore import QObject  # noqa: E402
+from PyQt6.QtCore import QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from main import BreakActivityWindow  # noqa: E402
+
+ACTIVITIES = [
+    "Do some deep breathing exercises",
+    "Perform desk exercises",
+    "Get a glass of water",
+]
+
+
+class EventCounter(QObject):
+    """Counts the timer and paint events of a window and everything in it."""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.counts = {QEvent.Type.Timer: 0, QEvent.Type.Paint: 0}
+
+    def eventFilter(self, obj, event):
+        if event.type() in self.counts and self._inside_window(obj):
+            self.counts[event.type()] += 1
+        return False
+
+    def _inside_window(self, obj) -> bool:
+        while obj is not None:
+            if obj is self.window:
+                return True
+            obj = obj.parent()
+        return False
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def run_event_loop(ms: int):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+@pytest.mark.parametrize("activity", ACTIVITIES)
+def test_hidden_break_window_has_no_timers_or_paints(app, activity):
+    window = BreakActivityWindow(hold_duration=1, breath_duration=1)
+    window.set_activity(activity)
+    counter = EventCounter(window)
+    app.installEventFilter(counter)
+    try:
+        window.show()
+        run_event_loop(300)
+        # Showing the window paints it, so the counter does see its events
+        assert counter.counts[QEvent.Type.Paint]
+
+        window.hide()
+        run_event_loop(50)
+        counter.counts = dict.fromkeys(counter.counts, 0)
+        run_event_loop(1500)
+    finally:
+        app.removeEventFilter(counter)
+        window.deleteLater()
+
+    assert counter.counts == {QEvent.Type.Timer: 0, QEvent.Type.Paint: 0}
@@ -0,0 +1,178 @@
+import random
+
+from engine import AWAY_ACTIVITY
+from engine import BreakEngine
+from engine import Phase
+from engine import PhaseTimer
+from engine import VirtualClock
+
+
+def make_engine(clock: VirtualClock, **kwargs) -> BreakEngine:
+    kwargs.setdefault("work_duration", 1500)
+    kwargs.setdefault("break_duration", 300)
+    kwargs.setdefault("break_delay", 3)
+    return BreakEngine(clock=clock, rng=random.Random(1), **kwargs)
+
+
+def test_phase_timer_counts_down_to_its_deadline():
+    clock = VirtualClock(100.0)
+    timer = PhaseTimer(clock)
+    timer.start(60)
+    assert timer.deadline == 160.0
+
+    clock.advance(15)
+    assert timer.remaining() == 45.0
+    assert timer.elapsed() == 15.0
+    assert timer.progress() == 0.25
+    assert not timer.expired()
+
+    clock.advance(45)
+    assert timer.remaining() == 0.0
+    assert timer.expired()
+
+
+def test_phase_timer_pause_freezes_and_resume_pushes_the_deadline_back():
+    clock = VirtualClock()
+    timer = PhaseTimer(clock)
+    timer.start(60)
+    clock.advance(10)
+    timer.pause()
+
+    clock.advance(100)
+    assert timer.remaining() == 50.0
+    assert not timer.expired()
+
+    timer.resume()
+    assert timer.deadline == 160.0
+    clock.advance(50)
+    assert timer.expired()
+
+
+def test_work_runs_into_a_pending_break_then_the_break_then_idle():
+    clock = VirtualClock()
+    engine = make_engine(clock)
+    seen = []
+    engine.subscribe(seen.append)
+
+    engine.start_work()
+    assert engine.next_deadline() == 1500
+
+    clock.advance(1499.9)
+    assert engine.poll() == []
+
+    clock.advance(0.1)
+    (pending,) = engine.poll()
+    assert pending.phase is Phase.BREAK_PENDING
+    assert pending.at == 1500
+    assert pending.completed
+    assert pending.activity is not None
+    assert engine.next_deadline() == 1503
+
+    clock.advance(3)
+    (started,) = engine.poll()
+    assert started.phase is Phase.BREAK
+    # The break shows the activity chosen while it was pending
+    assert started.activity == pending.activity
+    assert engine.next_deadline() == 1803
+
+    clock.advance(300)
+    (finished,) = engine.poll()
+    assert finished.phase is Phase.IDLE
+    assert finished.previous is Phase.BREAK
+    assert finished.completed
+    assert engine.next_deadline() is None
+    assert [t.phase for t in seen] == [
+        Phase.WORK,
+        Phase.BREAK_PENDING,
+        Phase.BREAK,
+        Phase.IDLE,
+    ]
+
+
+def test_activity_durations_override_the_break_duration():
+    clock = VirtualClock()
+    engine = make_engine(clock)
+    engine.set_activities(["Stretch"], durations={"Stretch": 45})
+
+    transition = engine.start_break()
+    assert transition.activity == "Stretch"
+    assert engine.next_deadline() == 45
+
+
+def test_stopping_early_is_not_completed():
+    clock = VirtualClock()
+    engine = make_engine(clock)
+    engine.start_work()
+    clock.advance(600)
+
+    transition = engine.stop()
+    assert transition.previous is Phase.WORK
+    assert transition.elapsed == 600
+    assert not transition.completed
+
+
+def test_a_suspend_replays_every_missed_transition_without_drift():
+    clock = VirtualClock(1000.0)
+    engine = make_engine(clock)
+    engine.start_work()
+
+    # The laptop sleeps through work, the pending break and the break
+    clock.advance(3 * 3600)
+    transitions = engine.poll()
+
+    assert [(t.phase, t.at) for t in transitions] == [
+        (Phase.BREAK_PENDING, 2500.0),
+        (Phase.BREAK, 2503.0),
+        (Phase.IDLE, 2803.0),
+    ]
+    assert all(t.completed for t in transitions)
+    assert [t.elapsed for t in transitions] == [1500.0, 3.0, 300.0]
+    assert engine.phase is Phase.IDLE
+
+
+def test_a_short_absence_pauses_work():
+    clock = VirtualClock()
+    engine = make_engine(clock)
+    engine.start_work()
+    clock.advance(600)
+
+    engine.user_away(since=clock() - 60)
+    assert engine.timer.is_paused
+    assert engine.next_deadline() is None
+    clock.advance(120)
+    assert engine.poll() == []
+
+    assert engine.user_back(clock()) == []
+    assert engine.phase is Phase.WORK
+    # Paused from when the user left, 60 seconds before it was noticed
+    assert engine.remaining() == 960
+    assert engine.next_deadline() == clock() + 960
+
+
+def test_an_absence_as_long_as_a_break_counts_as_one():
+    clock = VirtualClock()
+    engine = make_engine(clock)
+    engine.start_work()
+    clock.advance(600)
+    engine.user_away(since=clock())
+
+    clock.advance(400)
+    away_break, work = engine.user_back(clock())
+
+    assert away_break.phase is Phase.BREAK
+    assert away_break.activity == AWAY_ACTIVITY
+    assert away_break.at == 600
+    assert work.phase is Phase.WORK
+    assert work.at == 1000
+    assert engine.next_deadline() == 2500
+
+
+def test_every_activity_is_shown_before_any_repeats():
+    clock = VirtualClock()
+    activities = ["a", "b", "c", "d"]
+    engine = make_engine(clock, activities=activities)
+
+    first_round = [engine.select_activity() for _ in activities]
+    second_round = [engine.select_activity() for _ in activities]
+    assert sorted(first_round) == activities
+    assert sorted(second_round) == activities
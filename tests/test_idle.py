@@ -0,0 +1,113 @@
+from engine import VirtualClock
+from idle import FakeIdleBackend
+from idle import IdleMonitor
+
+
+class Recorder:
+    def __init__(self):
+        self.away = []
+        self.back = []
+
+    def on_away(self, since: float):
+        self.away.append(since)
+
+    def on_back(self, away_since: float, returned_at: float):
+        self.back.append((away_since, returned_at))
+
+
+def make_monitor(clock: VirtualClock, backend: FakeIdleBackend, recorder: Recorder):
+    return IdleMonitor(
+        backend,
+        threshold=300,
+        min_interval=2.0,
+        max_interval=60.0,
+        on_away=recorder.on_away,
+        on_back=recorder.on_back,
+        clock=clock,
+    )
+
+
+def idle_for(clock: VirtualClock, backend: FakeIdleBackend, seconds: float):
+    """Let `seconds` pass without input."""
+    clock.advance(seconds)
+    backend.idle += seconds
+
+
+def test_active_user_is_checked_when_the_threshold_could_first_be_reached():
+    clock = VirtualClock(1000.0)
+    backend = FakeIdleBackend(idle=40)
+    recorder = Recorder()
+    monitor = make_monitor(clock, backend, recorder)
+
+    assert monitor.poll() == 260
+    backend.idle = 299.5
+    assert monitor.poll() == 2.0
+    assert not monitor.is_away
+    assert recorder.away == []
+
+
+def test_away_time_comes_from_the_idle_time_and_polls_back_off():
+    clock = VirtualClock(1000.0)
+    backend = FakeIdleBackend(idle=0)
+    recorder = Recorder()
+    monitor = make_monitor(clock, backend, recorder)
+
+    # The poll comes late, the user still left when input stopped
+    idle_for(clock, backend, 345)
+    intervals = [monitor.poll()]
+    assert monitor.is_away
+    assert recorder.away == [1000.0]
+
+    for _ in range(6):
+        idle_for(clock, backend, intervals[-1])
+        intervals.append(monitor.poll())
+    assert intervals == [2, 4, 8, 16, 32, 60, 60]
+    assert recorder.away == [1000.0]
+    assert recorder.back == []
+
+
+def test_return_is_dated_from_the_idle_time_and_polling_starts_over():
+    clock = VirtualClock(1000.0)
+    backend = FakeIdleBackend(idle=300)
+    recorder = Recorder()
+    monitor = make_monitor(clock, backend, recorder)
+    monitor.poll()
+    idle_for(clock, backend, 1000)
+    monitor.poll()
+
+    # Input 20 seconds before the next poll
+    clock.advance(60)
+    backend.idle = 20
+    assert monitor.poll() == 280
+    assert not monitor.is_away
+    assert recorder.back == [(700.0, 2040.0)]
+
+    # Going away again backs off from the shortest interval
+    idle_for(clock, backend, 280)
+    assert monitor.poll() == 2.0
+    assert recorder.away == [700.0, 2040.0]
+
+
+def test_idle_time_growing_with_the_clock_is_not_a_return():
+    clock = VirtualClock()
+    backend = FakeIdleBackend(idle=300)
+    recorder = Recorder()
+    monitor = make_monitor(clock, backend, recorder)
+    monitor.poll()
+
+    # Polls a little early or late are within the one second tolerance
+    clock.advance(10)
+    backend.idle = 309.5
+    monitor.poll()
+    assert monitor.is_away
+    assert recorder.back == []
+
+
+def test_unknown_idle_time_polls_at_the_longest_interval():
+    clock = VirtualClock()
+    backend = FakeIdleBackend(idle=None)
+    recorder = Recorder()
+    monitor = make_monitor(clock, backend, recorder)
+
+    assert monitor.poll() == 60.0
+    assert recorder.away == recorder.back == []
@@ -0,0 +1,124 @@
+import json
+import time
+from datetime import date
+
+from journal import SessionJournal
+
+NOW = time.time()
+TODAY = date.fromtimestamp(NOW)
+
+
+def make_journal(directory) -> SessionJournal:
+    return SessionJournal(directory, flush_interval=0.0)
+
+
+def write_events(directory, events: list[dict]):
+    """Record `events` through a journal and let it write them out."""
+    journal = make_journal(directory)
+    journal.start()
+    for event in events:
+        journal.record(dict(event))
+    journal.close()
+
+
+def work(seconds: float, completed: bool = True) -> dict:
+    return {"type": "work", "time": NOW, "seconds": seconds, "completed": completed}
+
+
+def breaks(activity: str, completed: bool = True) -> dict:
+    return {
+        "type": "break",
+        "time": NOW,
+        "seconds": 300.0,
+        "completed": completed,
+        "activity": activity,
+    }
+
+
+def test_rollups_are_loaded_from_the_snapshot_without_replaying(tmp_path):
+    write_events(tmp_path, [work(1500), breaks("Stretch"), work(600, False)])
+
+    journal = make_journal(tmp_path)
+    snapshot = json.loads((tmp_path / "rollups.json").read_text())
+    assert snapshot["offset"] == (tmp_path / "journal.jsonl").stat().st_size
+    stats = journal.stats(TODAY, TODAY)
+    assert stats["work_sessions"] == 2
+    assert stats["work_completed"] == 1
+    assert stats["work_seconds"] == 2100
+    assert stats["breaks"] == 1
+    assert stats["activities"] == {"Stretch": 1}
+    assert journal.week_stats(TODAY)["work_sessions"] == 2
+
+
+def test_events_after_the_snapshot_offset_are_replayed(tmp_path):
+    write_events(tmp_path, [work(1500)])
+    # Appended by a run that crashed before its next snapshot
+    with open(tmp_path / "journal.jsonl", "a") as f:
+        f.write(json.dumps(breaks("Walk")) + "\n")
+
+    stats = make_journal(tmp_path).stats(TODAY, TODAY)
+    assert stats["work_sessions"] == 1
+    assert stats["breaks"] == 1
+    assert stats["activities"] == {"Walk": 1}
+
+
+def test_a_torn_last_line_is_truncated(tmp_path):
+    write_events(tmp_path, [work(1500)])
+    path = tmp_path / "journal.jsonl"
+    size = path.stat().st_size
+    with open(path, "a") as f:
+        f.write('{"type": "break", "ti')
+
+    journal = make_journal(tmp_path)
+    assert path.stat().st_size == size
+    assert journal.stats(TODAY, TODAY)["breaks"] == 0
+
+    # The next append starts on a line of its own
+    journal.start()
+    journal.record(breaks("Walk"))
+    journal.close()
+    assert make_journal(tmp_path).stats(TODAY, TODAY)["breaks"] == 1
+
+
+def test_a_journal_shorter_than_the_snapshot_offset_is_rebuilt(tmp_path):
+    write_events(tmp_path, [work(1500), work(1500), work(1500)])
+    # Replaced by an older copy, the snapshot counts events it lost
+    (tmp_path / "journal.jsonl").write_text(json.dumps(work(900)) + "\n")
+
+    stats = make_journal(tmp_path).stats(TODAY, TODAY)
+    assert stats["work_sessions"] == 1
+    assert stats["work_seconds"] == 900
+
+
+def test_a_session_left_open_is_recorded_as_interrupted(tmp_path):
+    write_events(tmp_path, [work(1500), {"type": "break_started", "time": NOW}])
+
+    journal = make_journal(tmp_path)
+    journal.start()
+    journal.close()
+    assert journal.stats(TODAY, TODAY)["interrupted"] == 1
+
+    # Recorded once, the next load finds the session closed
+    journal = make_journal(tmp_path)
+    journal.start()
+    journal.close()
+    assert journal.stats(TODAY, TODAY)["interrupted"] == 1
+
+
+def test_corrupt_entries_are_skipped(tmp_path):
+    lines = [
+        json.dumps(work(1500)),
+        "not json",
+        "123",
+        "[1, 2]",
+        json.dumps({"type": "work", "time": NOW}),
+        json.dumps({**breaks("Walk"), "time": "today"}),
+        json.dumps({**breaks("Walk"), "activity": ["Walk"]}),
+        json.dumps(breaks("Walk")),
+    ]
+    (tmp_path / "journal.jsonl").write_text("\n".join(lines) + "\n")
+
+    stats = make_journal(tmp_path).stats(TODAY, TODAY)
+    assert stats["work_sessions"] == 1
+    assert stats["breaks"] == 1
+    assert stats["activities"] == {"Walk": 1}
@@ -0,0 +1,52 @@
+import gzip
+import logging
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt6.QtWidgets")
+
+from main import CompressingRotatingFileHandler  # noqa: E402
+
+WEEK = 7 * 24 * 3600
+
+
+def log(handler: CompressingRotatingFileHandler, message: str):
+    handler.handle(logging.makeLogRecord({"msg": message, "levelno": logging.INFO}))
+
+
+def test_log_older_than_max_age_is_rotated_and_compressed(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("old\n")
+    backdated = time.time() - WEEK - 60
+    os.utime(path, (backdated, backdated))
+
+    handler = CompressingRotatingFileHandler(str(path), max_age=WEEK)
+    log(handler, "new")
+    handler.close()
+
+    assert path.read_text() == "new\n"
+    with gzip.open(tmp_path / "app.log.1.gz", "rt") as f:
+        assert f.read() == "old\n"
+
+
+def test_restarts_appending_to_the_log_do_not_postpone_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    handler = CompressingRotatingFileHandler(str(path), max_age=WEEK)
+    log(handler, "first run")
+    handler.close()
+
+    # The log was started over a week ago and written to on every run since
+    stamp = tmp_path / "app.log.started"
+    stamp.write_text(repr(time.time() - WEEK - 60))
+    handler = CompressingRotatingFileHandler(str(path), max_age=WEEK)
+    log(handler, "last run")
+    handler.close()
+
+    assert path.read_text() == "last run\n"
+    with gzip.open(tmp_path / "app.log.1.gz", "rt") as f:
+        assert f.read() == "first run\n"
+    # The new log's age starts now
+    assert float(stamp.read_text()) > time.time() - 60
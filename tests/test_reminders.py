@@ -0,0 +1,120 @@
+from engine import VirtualClock
+from reminders import parse_reminders
+from reminders import Reminder
+from reminders import ReminderScheduler
+
+
+def activities(reminders: list[Reminder]) -> list[str]:
+    return [reminder.activity for reminder in reminders]
+
+
+def test_parse_keeps_every_valid_rule():
+    reminders = parse_reminders("20:Stretch; 60:Stretch;;x:Walk;-5:Walk;10:")
+    assert activities(reminders) == ["Stretch", "Stretch"]
+    assert [reminder.interval for reminder in reminders] == [1200, 3600]
+    assert len({reminder.name for reminder in reminders}) == 2
+
+    scheduler = ReminderScheduler(reminders, clock=VirtualClock())
+    assert len(scheduler) == 2
+    assert scheduler.next_deadline() == 1200
+
+
+def test_recurring_reminders_repeat_and_one_off_reminders_do_not():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [
+            Reminder("eyes", "Look away", interval=600),
+            Reminder("call", "Call back", due=900),
+        ],
+        clock=clock,
+    )
+
+    clock.advance(600)
+    assert activities(scheduler.poll()) == ["Look away"]
+    assert scheduler.next_deadline() == 900
+    clock.advance(300)
+    assert activities(scheduler.poll()) == ["Call back"]
+    assert len(scheduler) == 1
+    assert scheduler.next_deadline() == 1200
+
+
+def test_reminders_due_just_before_a_break_are_held_for_it():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [Reminder("eyes", "Look away", interval=600)],
+        coalesce_window=120,
+        clock=clock,
+    )
+
+    clock.advance(600)
+    assert scheduler.poll(break_at=700) == []
+    assert scheduler.is_held
+    assert scheduler.next_deadline() is None
+
+    # The break does the reminder, its interval starts over when it ends
+    clock.advance(400)
+    assert scheduler.poll() == []
+    scheduler.release(at=1000, satisfied=True)
+    assert scheduler.next_deadline() == 1600
+    assert scheduler.poll() == []
+
+
+def test_reminders_due_long_before_a_break_are_handed_out():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [Reminder("eyes", "Look away", interval=600)],
+        coalesce_window=120,
+        clock=clock,
+    )
+    clock.advance(600)
+    assert activities(scheduler.poll(break_at=900)) == ["Look away"]
+    assert not scheduler.is_held
+
+
+def test_reminders_due_during_an_unsatisfied_hold_come_after_it():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [Reminder("eyes", "Look away", interval=600)], clock=clock
+    )
+    scheduler.hold()
+    clock.advance(700)
+    assert scheduler.poll() == []
+
+    scheduler.release()
+    assert scheduler.next_deadline() == 600
+    assert activities(scheduler.poll()) == ["Look away"]
+    assert scheduler.next_deadline() == 1200
+
+
+def test_repeats_missed_while_suspended_are_folded_into_one():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [Reminder("eyes", "Look away", interval=600)], clock=clock
+    )
+
+    clock.advance(2150)
+    assert activities(scheduler.poll()) == ["Look away"]
+    assert scheduler.next_deadline() == 2750
+    assert scheduler.poll() == []
+
+
+def test_replaced_and_removed_reminders_leave_stale_entries_that_are_skipped():
+    clock = VirtualClock()
+    scheduler = ReminderScheduler(
+        [
+            Reminder("eyes", "Look away", interval=600),
+            Reminder("water", "Drink", interval=900),
+        ],
+        clock=clock,
+    )
+    scheduler.add(Reminder("eyes", "Look away", interval=1200))
+    assert scheduler.next_deadline() == 900
+
+    scheduler.remove("water")
+    assert scheduler.next_deadline() == 1200
+    # The stale entries were dropped on the way to the live one
+    assert len(scheduler._heap) == 1
+
+    clock.advance(1200)
+    assert activities(scheduler.poll()) == ["Look away"]
+    assert scheduler.next_deadline() == 2400